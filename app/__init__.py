@@ -14,8 +14,18 @@ from .api.auth_routes import auth_routes
 from .api.asset_routes import asset_routes
 from .api.tag_routes import tag_routes
 from .api.upload_routes import upload_routes
+from .api.job_routes import job_routes
 from .seeds import seed_commands
+from .search import search_commands
+from .changes import changes_commands
+from .jobs import worker_command
+from .asset_jobs import extract_fbx_command, fbx_info_command
+from .reconcile import reconcile_command
 from .config import Config
+from . import json_provider, replica, response_cache
+from .metrics import metrics
+from .user_cache import user_cache
+from .static_files import StaticFiles
 
 load_dotenv()
 
@@ -28,15 +38,24 @@ login.login_view = "auth.unauthorized"
 
 @login.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    return user_cache.load(int(id))
 
 # --- CLI Commands ---
 app.cli.add_command(seed_commands)
+app.cli.add_command(search_commands)
+app.cli.add_command(changes_commands)
+app.cli.add_command(worker_command)
+# `flask assets reconcile|extract-fbx|fbx-info`, next to the blueprint's own commands
+for command in (reconcile_command, extract_fbx_command, fbx_info_command):
+    asset_routes.cli.add_command(command)
 
 # --- Config / DB / Migrate ---
 app.config.from_object(Config)
 db.init_app(app)
 Migrate(app, db)
+json_provider.init_app(app)
+metrics.init_app(app)
+replica.init_app(app)
 
 # --- CORS ---
 # If your frontend is same-origin (served by Flask), this is permissive and fine.
@@ -55,9 +74,29 @@ else:
     ]
 CORS(app, resources={r"/api/*": {"origins": origins}})
 
-# --- Ensure Postgres search_path (for every pooled connection) ---
+# --- Ensure Postgres search_path (for every pooled connection, on every pool) ---
 schema = os.environ.get("SCHEMA", "public")
 
+def set_search_path(dbapi_connection, connection_record):
+    # Runs once per new DBAPI connection, before the pool hands it to any
+    # thread, so concurrent workers never share or race on it. The SET must
+    # not sit in the connection's first transaction: the pool's rollback on
+    # checkin would undo it and later checkouts would lose the schema.
+    autocommit = getattr(dbapi_connection, "autocommit", None)
+    try:
+        if autocommit is not None:
+            dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cur:
+            cur.execute(f"SET search_path TO {schema}, public")
+    except Exception:
+        try:
+            dbapi_connection.execute(f"SET search_path TO {schema}, public")
+        except Exception:
+            pass
+    finally:
+        if autocommit is not None:
+            dbapi_connection.autocommit = autocommit
+
 with app.app_context():
     backend = db.engine.url.get_backend_name()  # ex: 'postgresql+psycopg2' or 'sqlite'
     if str(backend).startswith("postgresql"):
@@ -65,17 +104,16 @@ with app.app_context():
         db.session.execute(text(f"SET search_path TO {schema}, public"))
         db.session.commit()
 
-        # Ensure for each new connection acquired from the pool
-        @event.listens_for(db.engine, "connect")
-        def set_search_path(dbapi_connection, connection_record):
-            try:
-                with dbapi_connection.cursor() as cur:
-                    cur.execute(f"SET search_path TO {schema}, public")
-            except Exception:
-                try:
-                    dbapi_connection.execute(f"SET search_path TO {schema}, public")
-                except Exception:
-                    pass
+    # Ensure for each new connection acquired from the primary and replica pools
+    for engine in db.engines.values():
+        if engine.url.get_backend_name().startswith("postgresql"):
+            event.listen(engine, "connect", set_search_path)
+
+# --- Shared response cache ---
+# A (re)started worker may be pointed at a migrated or reseeded database,
+# so drop whatever the shared cache file still holds.
+with app.app_context():
+    response_cache.bump()
 
 # --- Blueprints ---
 app.register_blueprint(user_routes, url_prefix="/api/users")
@@ -83,6 +121,17 @@ app.register_blueprint(auth_routes, url_prefix="/api/auth")
 app.register_blueprint(asset_routes, url_prefix="/api/assets")
 app.register_blueprint(tag_routes, url_prefix="/api/tags")
 app.register_blueprint(upload_routes, url_prefix="/api/uploads")
+app.register_blueprint(job_routes, url_prefix="/api/jobs")
+
+# --- Static frontend ---
+# Built files (and client-side routes -> index.html) are answered by a WSGI
+# layer in front of Flask; see app/static_files.py
+app.wsgi_app = StaticFiles(
+    app.wsgi_app,
+    app.static_folder,
+    force_https=bool(os.environ.get("RENDER") or os.environ.get("FLASK_ENV") == "production"),
+    autorefresh=app.debug,
+)
 
 # --- HTTPS Redirect behind Render proxy ---
 @app.before_request
@@ -96,6 +145,9 @@ def https_redirect():
 # --- CSRF cookie for forms/fetch if you use it on the frontend ---
 @app.after_request
 def inject_csrf_token(response):
+    # Static files need no token (and should not start a session)
+    if request.endpoint in ("static", "react_root"):
+        return response
     response.set_cookie(
         "csrf_token",
         generate_csrf(),
@@ -115,6 +167,14 @@ def db_health():
         app.logger.exception("DB health failed")
         return jsonify({"ok": False, "error": str(e)}), 500
 
+# --- Prometheus metrics (all workers on this host) ---
+@app.get("/api/metrics")
+def prometheus_metrics():
+    """
+    Request latency, SQL, DB pool, S3 presign and job metrics in Prometheus text format
+    """
+    return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 # --- Global JSON error handler (prevents opaque 500s in the UI) ---
 @app.errorhandler(Exception)
 def handle_all_errors(e):
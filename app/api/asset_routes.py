@@ -1,31 +1,316 @@
 # app/api/asset_routes.py
-from flask import Blueprint, request, jsonify, current_app
-from ..models import db, Asset, Tag
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from ..models import db, Asset, Tag, asset_tags
+from .s3 import bucket_name, get_client, presign_get
+from .. import changes, jobs, replica, response_cache, search
+from ..asset_jobs import record_sha256
+from ..assets import asset_to_dict, chunks, delete_asset_rows, is_fbx, sha256_arg
+from ..tag_index import page_ids, tag_index
 
 asset_routes = Blueprint("assets", __name__)
 
-def _asset_to_dict(a):
-    # Fail-safe serializer (don’t call S3 here)
-    return {
-        "id": a.id,
-        "name": getattr(a, "name", None),
-        "description": getattr(a, "description", None),
-        "url": getattr(a, "url", None),               # if you store public URL
-        "s3_key": getattr(a, "s3_key", None),         # if you store S3 key
-        "content_type": getattr(a, "content_type", None),
-        "tags": [t.name for t in getattr(a, "tags", [])],
-        "created_at": (getattr(a, "created_at", None).isoformat()
-                       if getattr(a, "created_at", None) else None),
-    }
+def _int_arg(name, default=None):
+    """Parse an optional integer query arg; raises ValueError on junk."""
+    raw = request.args.get(name)
+    if raw is None or raw == "":
+        return default
+    return int(raw)
+
+# ?<name>_min=&<name>_max= range filters over the extracted FBX metadata
+_METADATA_FILTERS = {
+    "polygons": Asset.polygon_count,
+    "meshes": Asset.mesh_count,
+    "materials": Asset.material_count,
+    "bones": Asset.bone_count,
+    "fbx_version": Asset.fbx_version,
+}
+
+def _metadata_filters():
+    """SQL conditions for the metadata range args present; raises ValueError on junk."""
+    conds = []
+    for name, col in _METADATA_FILTERS.items():
+        lo, hi = _int_arg(f"{name}_min"), _int_arg(f"{name}_max")
+        if lo is not None:
+            conds.append(col >= lo)
+        if hi is not None:
+            conds.append(col <= hi)
+    return conds
+
+def _tag_condition(tag_names, mode):
+    """SQL form of the tag filter, for when it is combined with metadata filters."""
+    q = (db.select(asset_tags.c.asset_id)
+         .join(Tag, Tag.id == asset_tags.c.tag_id)
+         .where(Tag.name.in_(tag_names)))
+    if mode == "all":
+        q = q.group_by(asset_tags.c.asset_id).having(db.func.count() == len(tag_names))
+    return Asset.id.in_(q)
+
+def _with_download_url(d, s3):
+    # ?presign=1: sign locally with the shared client so the UI needs no
+    # second round trip to /api/uploads/get-url(s)
+    d["download_url"] = presign_get(d["s3_key"], 300, client=s3) if d["s3_key"] else None
+    return d
+
+# ?fields= sparse fieldsets: public name -> column. "tags" (the tag names)
+# costs one extra query per page; "id" is always included.
+_FIELDS = {
+    name: getattr(Asset, name)
+    for name in ("id", "name", "description", "url", "s3_key", "content_type",
+                 "content_sha256", "fbx_version", "polygon_count", "mesh_count",
+                 "material_count", "bone_count", "created_at")
+}
+
+def _fields_arg(allowed):
+    """?fields=a,b,c -> ["id", "a", ...], or None for whole objects. Raises ValueError."""
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError("unknown fields: " + ", ".join(unknown))
+    if "id" not in fields:
+        fields.insert(0, "id")
+    return fields
+
+def _select_fields(fields, presign=False):
+    """Column-only select for the fields: plain rows, no ORM objects."""
+    cols = [_FIELDS[f] for f in fields if f in _FIELDS]
+    if presign and "s3_key" not in fields:
+        cols.append(Asset.s3_key)
+    return db.select(*cols)
+
+def _tag_names_by_asset(ids):
+    q = (db.select(asset_tags.c.asset_id, Tag.name)
+         .join(Tag, Tag.id == asset_tags.c.tag_id)
+         .where(asset_tags.c.asset_id.in_(ids)))
+    out = {}
+    for asset_id, name in db.session.execute(q):
+        out.setdefault(asset_id, []).append(name)
+    return out
+
+def _rows_to_dicts(rows, fields, s3=None):
+    """Projected rows -> dicts; pass s3 to add "download_url" as with ?presign=1."""
+    out = [dict(r._mapping) for r in rows]
+    if "tags" in fields and out:
+        names = _tag_names_by_asset([d["id"] for d in out])
+        for d in out:
+            d["tags"] = names.get(d["id"], [])
+    if s3 is not None:
+        for d in out:
+            _with_download_url(d, s3)
+            if "s3_key" not in fields:
+                del d["s3_key"]
+    return out
+
+def _stream_assets(query, presign=False, fields=None):
+    # One JSON document per line; rows are pulled from the cursor in chunks
+    # so memory stays flat no matter how big the catalog is.
+    chunk = current_app.config["ASSETS_STREAM_CHUNK"]
+    s3 = get_client() if presign else None
+    dumps = current_app.json.dumps
+    if fields:
+        result = db.session.execute(query.execution_options(yield_per=chunk))
+        for rows in result.partitions():
+            for d in _rows_to_dicts(rows, fields, s3):
+                yield dumps(d) + "\n"
+        return
+    for a in query.yield_per(chunk):
+        d = asset_to_dict(a)
+        if presign:
+            _with_download_url(d, s3)
+        yield dumps(d) + "\n"
 
 @asset_routes.get("")
+# Tag-filtered pages come from this worker's own tag index, which can lag
+# other workers' writes; they must not be shared through the cache
+@response_cache.cached_response(skip_args=("presign", "format", "tags"))
+@replica.use_replica
 def list_assets():
+    """
+    GET /api/assets?limit=<n>&after=<id>
+    Keyset pagination, newest first. Returns
+    { "assets": [...], "next_cursor": <id or null> }; pass next_cursor back
+    as ?after= to fetch the following page.
+
+    GET /api/assets?format=ndjson[&after=<id>]
+    Streams every matching asset as newline-delimited JSON.
+
+    Add &presign=1 to either form to include a presigned "download_url"
+    (5 minutes) for assets stored in S3.
+
+    Add &fields=id,name,url,tags (any asset keys) to any form to get only
+    those keys (plus "id"), read with a column-only query.
+
+    GET /api/assets?tags=a,b,c&mode=all|any[&limit=<n>&after=<id>]
+    Tag-filtered page from the in-memory tag index (never served from the
+    response cache). Adds "total" and "facets" ({tag name: matching asset
+    count} for the other tags).
+
+    Any form also takes FBX metadata ranges: polygons_min/_max,
+    meshes_min/_max, materials_min/_max, bones_min/_max and
+    fbx_version_min/_max (e.g. ?bones_min=1&polygons_max=5000). Combined
+    with tags they are answered from SQL, without "total"/"facets".
+    """
     try:
-        items = Asset.query.order_by(Asset.id.desc()).all()
-        return jsonify([_asset_to_dict(a) for a in items]), 200
-    except Exception as e:
+        try:
+            after = _int_arg("after")
+            limit = _int_arg("limit", current_app.config["ASSETS_PAGE_SIZE"])
+            conds = _metadata_filters()
+        except ValueError:
+            return {"error": "limit, after and metadata filters must be integers"}, 400
+        if after is not None and after < 0:
+            return {"error": "after must not be negative"}, 400
+        try:
+            fields = _fields_arg(set(_FIELDS) | {"tags"})
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        presign = request.args.get("presign") in ("1", "true")
+
+        tag_names = list(dict.fromkeys(
+            t.strip() for t in request.args.get("tags", "").split(",") if t.strip()
+        ))
+        if tag_names:
+            mode = request.args.get("mode", "all")
+            if mode not in ("all", "any"):
+                return {"error": "mode must be 'all' or 'any'"}, 400
+            if not conds:
+                limit = max(1, min(limit, current_app.config["ASSETS_MAX_PAGE_SIZE"]))
+                return _list_by_tags(tag_names, mode, limit, after, presign, fields)
+            conds.append(_tag_condition(tag_names, mode))
+
+        if fields:
+            q = _select_fields(fields, presign)
+        else:
+            q = Asset.query
+        q = q.filter(*conds).order_by(Asset.id.desc())
+        if after is not None:
+            q = q.filter(Asset.id < after)
+
+        if request.args.get("format") == "ndjson":
+            return Response(
+                stream_with_context(_stream_assets(q, presign, fields)),
+                mimetype="application/x-ndjson",
+            )
+
+        limit = max(1, min(limit, current_app.config["ASSETS_MAX_PAGE_SIZE"]))
+        # Fetch one extra row to know whether another page exists
+        q = q.limit(limit + 1)
+        items = db.session.execute(q).all() if fields else q.all()
+        next_cursor = items[limit - 1].id if len(items) > limit else None
+        s3 = get_client() if presign else None
+        if fields:
+            out = _rows_to_dicts(items[:limit], fields, s3)
+        else:
+            out = [asset_to_dict(a) for a in items[:limit]]
+            if presign:
+                out = [_with_download_url(d, s3) for d in out]
+        return jsonify({
+            "assets": out,
+            "next_cursor": next_cursor,
+        }), 200
+    except Exception:
         current_app.logger.exception("List assets failed")
-        return jsonify({"error": "internal", "detail": str(e)}), 500
+        return jsonify({"error": "internal"}), 500
+
+def _list_by_tags(tag_names, mode, limit, after, presign, fields=None):
+    matched = tag_index.match(tag_names, mode)
+    ids, has_more = page_ids(matched, limit, after)
+    s3 = get_client() if presign else None
+    # The index may briefly lag other workers' deletes; missing rows are skipped
+    if fields:
+        rows = db.session.execute(
+            _select_fields(fields, presign).where(Asset.id.in_(ids)).order_by(Asset.id.desc())
+        ).all() if ids else []
+        out = _rows_to_dicts(rows, fields, s3)
+    else:
+        by_id = {a.id: a for a in Asset.query.filter(Asset.id.in_(ids))} if ids else {}
+        out = [asset_to_dict(by_id[i]) for i in ids if i in by_id]
+        if presign:
+            out = [_with_download_url(d, s3) for d in out]
+    return jsonify({
+        "assets": out,
+        "next_cursor": ids[-1] if has_more else None,
+        "total": len(matched),
+        "facets": tag_index.facets(matched, exclude=set(tag_names)),
+    }), 200
+
+@asset_routes.get("/search")
+def search_assets():
+    """
+    GET /api/assets/search?q=<words>&limit=<n>&offset=<n>
+    Ranked full-text search over name, tags and description; every word must
+    match (as a prefix). Returns { "assets": [...], "next_offset": <n or null> }
+    """
+    try:
+        try:
+            limit = _int_arg("limit", current_app.config["ASSETS_PAGE_SIZE"])
+            offset = max(0, _int_arg("offset", 0))
+        except ValueError:
+            return {"error": "limit and offset must be integers"}, 400
+        limit = max(1, min(limit, current_app.config["ASSETS_MAX_PAGE_SIZE"]))
+
+        ids = search.search_ids(request.args.get("q"), limit + 1, offset)
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        by_id = {a.id: a for a in Asset.query.filter(Asset.id.in_(ids))} if ids else {}
+        return jsonify({
+            "assets": [asset_to_dict(by_id[i]) for i in ids if i in by_id],
+            "next_offset": offset + limit if has_more else None,
+        }), 200
+    except Exception:
+        current_app.logger.exception("Search assets failed")
+        return jsonify({"error": "internal"}), 500
+
+@asset_routes.get("/changes")
+@response_cache.cached_response()
+@replica.use_replica
+def asset_changes():
+    """
+    GET /api/assets/changes?since=<cursor>&limit=<n>[&fields=...]
+    Assets created, updated, retagged or deleted after `since` (omit it, or
+    pass 0, for the whole catalog). Returns
+    { "assets": [...current rows...], "deleted": [ids], "cursor": <n>,
+      "has_more": bool }; pass cursor back as ?since= for the next delta,
+    right away while has_more is true.
+    """
+    try:
+        try:
+            since = _int_arg("since", 0)
+            limit = _int_arg("limit", current_app.config["ASSETS_PAGE_SIZE"])
+        except ValueError:
+            return {"error": "since and limit must be integers"}, 400
+        try:
+            fields = _fields_arg(set(_FIELDS) | {"tags"})
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        limit = max(1, min(limit, current_app.config["ASSETS_MAX_PAGE_SIZE"]))
+
+        ids, cursor, has_more = changes.read(since, limit)
+        if fields:
+            rows = db.session.execute(
+                _select_fields(fields).where(Asset.id.in_(ids))
+            ).all() if ids else []
+            by_id = {d["id"]: d for d in _rows_to_dicts(rows, fields)}
+        else:
+            by_id = {
+                a.id: asset_to_dict(a) for a in Asset.query.filter(Asset.id.in_(ids))
+            } if ids else {}
+        return jsonify({
+            "assets": [by_id[i] for i in ids if i in by_id],
+            "deleted": [i for i in ids if i not in by_id],
+            "cursor": cursor,
+            "has_more": has_more,
+        }), 200
+    except Exception:
+        current_app.logger.exception("Asset changes failed")
+        return jsonify({"error": "internal"}), 500
 
 @asset_routes.post("")
 def create_asset():
@@ -39,6 +324,14 @@ def create_asset():
         url = data.get("url")  # optional if saving public URL
         s3_key = data.get("s3_key")  # optional if saving S3 key
         content_type = data.get("content_type")
+        try:
+            sha = sha256_arg(data.get("content_sha256"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if sha:
+            dup = Asset.query.filter_by(content_sha256=sha).first()
+            if dup:
+                return {"error": "duplicate content", "asset": asset_to_dict(dup)}, 409
 
         tag_names = data.get("tags", []) or []
 
@@ -53,6 +346,7 @@ def create_asset():
                 a.s3_key = s3_key
         if content_type and hasattr(a, "content_type"):
             a.content_type = content_type
+        a.content_sha256 = sha
 
         # Attach/create tags
         tags = []
@@ -68,22 +362,492 @@ def create_asset():
         a.tags = tags
 
         db.session.add(a)
+        db.session.flush()
+        job = None
+        if a.s3_key:
+            # Hash (and for FBX, inspect) the uploaded object off the request path
+            job = jobs.enqueue("asset.verify_hash", {"asset_id": a.id})
+            if is_fbx(a.s3_key):
+                jobs.enqueue("asset.extract_fbx", {"asset_id": a.id})
+            db.session.flush()
+        search.index_assets([a.id])
+        changes.record([a.id])
         db.session.commit()
-        return _asset_to_dict(a), 201
+        response_cache.bump()
+        tag_index.add_asset(a.id, [(t.id, t.name) for t in a.tags])
+        out = asset_to_dict(a)
+        out["job_id"] = job.id if job else None
+        return out, 201
 
-    except Exception as e:
+    except Exception:
         current_app.logger.exception("Create asset failed")
         db.session.rollback()
-        return jsonify({"error": "internal", "detail": str(e)}), 500
+        return jsonify({"error": "internal"}), 500
 
 @asset_routes.route("/<int:asset_id>", methods=["DELETE"])
 def delete_asset(asset_id):
+    # Column-only reads and set-based deletes: no Asset/Tag objects or
+    # per-link DELETEs (asset_tags also cascades on Postgres)
+    s3_key = db.session.execute(
+        db.select(Asset.s3_key).where(Asset.id == asset_id)
+    ).first()
+    if not s3_key:
+        return {"error": "not found"}, 404
+    s3_key = s3_key[0]
     try:
-        a = Asset.query.get_or_404(asset_id)
-        db.session.delete(a)
+        tag_ids = db.session.execute(
+            db.select(asset_tags.c.tag_id).where(asset_tags.c.asset_id == asset_id)
+        ).scalars().all()
+        job = None
+        if s3_key:
+            job = jobs.enqueue("asset.delete_object", {"key": s3_key})
+        search.unindex_assets([asset_id])
+        changes.record([asset_id])
+        db.session.execute(asset_tags.delete().where(asset_tags.c.asset_id == asset_id))
+        db.session.execute(db.delete(Asset).where(Asset.id == asset_id))
         db.session.commit()
-        return jsonify({"ok": True}), 200
-    except Exception as e:
+        response_cache.bump()
+        tag_index.remove_asset(asset_id, tag_ids)
+        return jsonify({"ok": True, "job_id": job.id if job else None}), 200
+    except Exception:
         current_app.logger.exception("Delete asset failed")
         db.session.rollback()
-        return jsonify({"error": "internal", "detail": str(e)}), 500
+        return jsonify({"error": "internal"}), 500
+
+@asset_routes.post("/<int:asset_id>/verify-hash")
+def verify_asset_hash(asset_id):
+    """
+    POST /api/assets/<id>/verify-hash
+    Streams the asset's S3 object, records its SHA-256 and reports whether
+    it matches the client's claim. 409 if another asset has the same content
+    (this asset's hash is then cleared).
+    """
+    a = Asset.query.get(asset_id)
+    if not a:
+        return {"error": "not found"}, 404
+    if not a.s3_key:
+        return {"error": "asset has no s3_key"}, 400
+    try:
+        digest, dup_id, matched = record_sha256(a)
+        if dup_id:
+            return {"ok": False, "sha256": digest, "duplicate_of": dup_id}, 409
+        return {"ok": True, "sha256": digest, "matched_claim": matched}, 200
+    except Exception:
+        current_app.logger.exception("Verify asset hash failed")
+        db.session.rollback()
+        return jsonify({"error": "internal"}), 500
+
+# ---------- bulk ingest -------------------------------------------------------
+
+def _bulk_items():
+    """
+    Yield (index, payload) from either a JSON array body or an NDJSON stream
+    (Content-Type: application/x-ndjson). NDJSON is read line by line, so the
+    request body is never held in memory as a whole.
+    """
+    if request.mimetype == "application/x-ndjson":
+        # Raw lines are decoded per item in _bulk_row so bad JSON only
+        # fails its own line
+        lines = (line.strip() for line in request.stream)
+        yield from enumerate(line for line in lines if line)
+        return
+    data = request.get_json(force=True)
+    if isinstance(data, dict):
+        data = data.get("assets")
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON array of assets")
+    yield from enumerate(data)
+
+def _bulk_row(payload):
+    """Validate one bulk item -> (column values, tag names). Raises ValueError."""
+    if isinstance(payload, bytes):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            raise ValueError("invalid JSON")
+    if not isinstance(payload, dict):
+        raise ValueError("item must be a JSON object")
+    name = (payload.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    tag_names = []
+    for tname in payload.get("tags", []) or []:
+        tname = (tname or "").strip()
+        if not tname:
+            continue
+        if len(tname) > Tag.name.type.length:
+            raise ValueError(f"tag name too long: {tname[:20]}...")
+        if tname not in tag_names:
+            tag_names.append(tname)
+    fields = {"name": name, "description": payload.get("description")}
+    for col in ("url", "s3_key", "content_type"):
+        if payload.get(col):
+            fields[col] = payload[col]
+    sha = sha256_arg(payload.get("content_sha256"))
+    if sha:
+        fields["content_sha256"] = sha
+    return fields, tag_names
+
+def _resolve_tag_ids(names):
+    """{name: id} for every name, creating missing tags with one bulk insert."""
+    if not names:
+        return {}
+    def by_name(ns):
+        q = db.select(Tag.name, Tag.id).where(Tag.name.in_(list(ns)))
+        return dict(db.session.execute(q).all())
+
+    found = by_name(names)
+    missing = set(names) - found.keys()
+    if missing:
+        db.session.execute(db.insert(Tag), [{"name": n} for n in missing])
+        found.update(by_name(missing))
+    return found
+
+def _insert_chunk(rows):
+    """
+    Insert one chunk of (index, fields, tag_names) rows in a single
+    transaction: one tag lookup, batched asset INSERTs, one asset_tags
+    executemany. Returns [(index, asset_id)].
+    """
+    tag_ids = _resolve_tag_ids({n for _, _, names in rows for n in names})
+    assets = [Asset(**fields) for _, fields, _ in rows]
+    db.session.add_all(assets)
+    db.session.flush()
+    links = [
+        {"asset_id": a.id, "tag_id": tag_ids[n]}
+        for a, (_, _, names) in zip(assets, rows)
+        for n in names
+    ]
+    if links:
+        db.session.execute(asset_tags.insert(), links)
+    jobs.enqueue_many("asset.verify_hash", [{"asset_id": a.id} for a in assets if a.s3_key])
+    jobs.enqueue_many("asset.extract_fbx", [{"asset_id": a.id} for a in assets if is_fbx(a.s3_key)])
+    search.index_assets([a.id for a in assets])
+    changes.record([a.id for a in assets])
+    db.session.commit()
+    response_cache.bump()
+    for a, (_, _, names) in zip(assets, rows):
+        tag_index.add_asset(a.id, [(tag_ids[n], n) for n in names])
+    return [(index, a.id) for a, (index, _, _) in zip(assets, rows)]
+
+def _split_duplicates(rows, results):
+    """
+    Drop rows whose content_sha256 is already stored (one IN query), adding
+    a "duplicate content" result with the stored asset's id. Returns (rows
+    to insert, rows repeating the hash of an earlier row in `rows`).
+    """
+    hashes = {fields["content_sha256"] for _, fields, _ in rows if "content_sha256" in fields}
+    stored = dict(db.session.execute(
+        db.select(Asset.content_sha256, Asset.id).where(Asset.content_sha256.in_(hashes))
+    ).all()) if hashes else {}
+    keep, repeats, seen = [], [], set()
+    for row in rows:
+        sha = row[1].get("content_sha256")
+        if sha in stored:
+            results.append({"index": row[0], "ok": False, "error": "duplicate content",
+                            "id": stored[sha]})
+        elif sha in seen:
+            repeats.append(row)
+        else:
+            if sha:
+                seen.add(sha)
+            keep.append(row)
+    return keep, repeats
+
+def _insert_singly(row, results):
+    try:
+        return _insert_chunk([row])
+    except Exception:
+        db.session.rollback()
+        current_app.logger.warning("Bulk item %s failed", row[0], exc_info=True)
+        # A concurrent request may have stored the same content meanwhile
+        sha = row[1].get("content_sha256")
+        dup = db.session.execute(
+            db.select(Asset.id).where(Asset.content_sha256 == sha)
+        ).scalar() if sha else None
+        if dup is not None:
+            results.append({"index": row[0], "ok": False, "error": "duplicate content", "id": dup})
+        else:
+            results.append({"index": row[0], "ok": False, "error": "insert failed"})
+        return []
+
+def _flush_chunk(rows, results):
+    rows, repeats = _split_duplicates(rows, results)
+    try:
+        created = _insert_chunk(rows) if rows else []
+    except Exception:
+        # Isolate the bad row(s): retry this chunk one item at a time so a
+        # single failure never costs the rest of the batch.
+        db.session.rollback()
+        current_app.logger.warning("Bulk chunk failed; retrying %d items singly", len(rows))
+        created = []
+        for row in rows:
+            created.extend(_insert_singly(row, results))
+    results.extend({"index": i, "ok": True, "id": asset_id} for i, asset_id in created)
+    if repeats:
+        # Repeats point at the row created for their hash; if that row
+        # failed, the first repeat takes its place
+        sha_of = {index: fields.get("content_sha256") for index, fields, _ in rows}
+        by_sha = {sha_of[i]: asset_id for i, asset_id in created}
+        retry = []
+        for row in repeats:
+            asset_id = by_sha.get(row[1]["content_sha256"])
+            if asset_id is None:
+                retry.append(row)
+            else:
+                results.append({"index": row[0], "ok": False, "error": "duplicate content",
+                                "id": asset_id})
+        if retry:
+            _flush_chunk(retry, results)
+
+@asset_routes.post("/bulk")
+def bulk_create_assets():
+    """
+    POST /api/assets/bulk[?chunk_size=<n>]
+    Body: JSON array of asset objects (same fields as POST /api/assets), or
+    NDJSON with Content-Type: application/x-ndjson.
+
+    Items are committed in chunks; a failing item never rolls back others.
+    Returns { "created": n, "failed": n, "results": [{index, ok, id|error}] }.
+    An item whose content_sha256 is already stored, or repeats an earlier
+    item's, fails with "duplicate content" and the stored asset's "id".
+    """
+    try:
+        chunk_size = _int_arg("chunk_size", current_app.config["ASSETS_BULK_CHUNK"])
+    except ValueError:
+        return {"error": "chunk_size must be an integer"}, 400
+    chunk_size = max(1, chunk_size)
+
+    results, rows = [], []
+    try:
+        for index, payload in _bulk_items():
+            try:
+                fields, tag_names = _bulk_row(payload)
+            except ValueError as e:
+                results.append({"index": index, "ok": False, "error": str(e)})
+                continue
+            rows.append((index, fields, tag_names))
+            if len(rows) >= chunk_size:
+                _flush_chunk(rows, results)
+                rows = []
+        if rows:
+            _flush_chunk(rows, results)
+    except ValueError as e:
+        return {"error": str(e), "results": results}, 400
+    except Exception:
+        current_app.logger.exception("Bulk create assets failed")
+        db.session.rollback()
+        return jsonify({"error": "internal", "results": results}), 500
+
+    results.sort(key=lambda r: r["index"])
+    created = sum(1 for r in results if r["ok"])
+    return jsonify({
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    }), 200
+
+
+# ---------- bulk delete -------------------------------------------------------
+
+S3_DELETE_BATCH = 1000   # delete_objects maximum
+
+def _shared_keys(rows):
+    """Keys in rows [(id, s3_key)] that assets outside rows also point at."""
+    deleting = Counter(key for _, key in rows if key)
+    shared = set()
+    for part in chunks(sorted(deleting)):
+        for key, n in db.session.execute(
+            db.select(Asset.s3_key, db.func.count())
+            .where(Asset.s3_key.in_(part))
+            .group_by(Asset.s3_key)
+        ):
+            if n > deleting[key]:
+                shared.add(key)
+    return shared
+
+def _object_sizes(keys, workers=16):
+    """{key: size in bytes, or None if the object is gone}, HEADed concurrently."""
+    s3, bucket = get_client(), bucket_name()
+
+    def head(key):
+        try:
+            return key, s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return key, None
+            raise
+
+    with ThreadPoolExecutor(workers) as pool:
+        return dict(pool.map(head, keys))
+
+@asset_routes.post("/bulk-delete")
+def bulk_delete_assets():
+    """
+    POST /api/assets/bulk-delete
+    Body: { "ids": [1, 2, ...] } or { "tags": ["a", "b"], "mode": "all"|"any" },
+    with "dry_run": true to only report what would be deleted.
+
+    Deletes the assets and their tag links set-wise. Their S3 objects
+    (unless another asset still uses them) are removed afterwards by
+    asset.delete_objects jobs of up to 1000 keys, retried with backoff.
+    Returns { "deleted", "objects", "job_ids" }; a dry run returns
+    { "count", "objects", "total_bytes", "missing_objects" }.
+    """
+    data = request.get_json(silent=True) or {}
+    ids, tag_names = data.get("ids"), data.get("tags")
+    if (ids is None) == (tag_names is None):
+        return {"error": "pass either ids or tags"}, 400
+
+    rows = []
+    q = db.select(Asset.id, Asset.s3_key)
+    if ids is not None:
+        if not isinstance(ids, list) or not all(
+            isinstance(i, int) and not isinstance(i, bool) for i in ids
+        ):
+            return {"error": "ids must be a list of integers"}, 400
+        for part in chunks(sorted(set(ids))):
+            rows.extend(db.session.execute(q.where(Asset.id.in_(part))).all())
+    else:
+        if isinstance(tag_names, str):
+            tag_names = tag_names.split(",")
+        if not isinstance(tag_names, list) or not all(isinstance(t, str) for t in tag_names):
+            return {"error": "tags must be a list of names"}, 400
+        tag_names = list(dict.fromkeys(t.strip() for t in tag_names if t.strip()))
+        mode = data.get("mode", "all")
+        if mode not in ("all", "any"):
+            return {"error": "mode must be 'all' or 'any'"}, 400
+        if not tag_names:
+            return {"error": "tags must not be empty"}, 400
+        rows = db.session.execute(q.where(_tag_condition(tag_names, mode))).all()
+
+    shared = _shared_keys(rows)
+    keys = sorted({key for _, key in rows if key and key not in shared})
+
+    if data.get("dry_run"):
+        try:
+            sizes = _object_sizes(keys)
+        except Exception:
+            current_app.logger.exception("Bulk delete dry run failed")
+            return jsonify({"error": "internal"}), 500
+        return {
+            "dry_run": True,
+            "count": len(rows),
+            "objects": len(keys),
+            "total_bytes": sum(v for v in sizes.values() if v),
+            "missing_objects": sum(1 for v in sizes.values() if v is None),
+        }, 200
+
+    try:
+        queued = [
+            jobs.enqueue("asset.delete_objects", {"keys": keys[i:i + S3_DELETE_BATCH]})
+            for i in range(0, len(keys), S3_DELETE_BATCH)
+        ]
+        delete_asset_rows([asset_id for asset_id, _ in rows])
+        db.session.commit()
+        if rows:
+            response_cache.bump()
+            tag_index.invalidate()
+        return {
+            "ok": True,
+            "deleted": len(rows),
+            "objects": len(keys),
+            "job_ids": [j.id for j in queued],
+        }, 200
+    except Exception:
+        current_app.logger.exception("Bulk delete failed")
+        db.session.rollback()
+        return jsonify({"error": "internal"}), 500
+
+
+# ---------- bulk retag --------------------------------------------------------
+
+def _retag_names(value, field):
+    """Clean, de-duplicated tag names from a JSON list. Raises ValueError."""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(t, str) for t in value):
+        raise ValueError(f"{field} must be a list of tag names")
+    names = list(dict.fromkeys(t.strip() for t in value if t.strip()))
+    for name in names:
+        if len(name) > Tag.name.type.length:
+            raise ValueError(f"tag name too long: {name[:20]}...")
+    return names
+
+@asset_routes.post("/retag")
+def retag_assets():
+    """
+    POST /api/assets/retag
+    Body: { "ids": [1, 2, ...], "add": ["tag", ...], "remove": ["tag", ...] }
+
+    Adds and removes tags across all the given assets in one transaction,
+    with INSERT ... SELECT / DELETE statements per chunk of ids (no ORM
+    objects are loaded). Tags in "add" that do not exist yet are created;
+    unknown ids and names in "remove" are ignored.
+    Returns { "assets": n matched, "added": n links, "removed": n links }.
+    """
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not all(
+        isinstance(i, int) and not isinstance(i, bool) for i in ids
+    ):
+        return {"error": "ids must be a list of integers"}, 400
+    try:
+        add = _retag_names(data.get("add"), "add")
+        remove = _retag_names(data.get("remove"), "remove")
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if not add and not remove:
+        return {"error": "pass add and/or remove"}, 400
+    if set(add) & set(remove):
+        return {"error": "a tag cannot be both added and removed"}, 400
+
+    try:
+        add_ids = _resolve_tag_ids(set(add))
+        remove_ids = db.session.execute(
+            db.select(Tag.id).where(Tag.name.in_(remove))
+        ).scalars().all() if remove else []
+        matched, added, removed = [], 0, 0
+        for part in chunks(sorted(set(ids))):
+            part = db.session.execute(
+                db.select(Asset.id).where(Asset.id.in_(part))
+            ).scalars().all()
+            if not part:
+                continue
+            matched.extend(part)
+            changed = 0
+            if add_ids:
+                has_link = (
+                    db.select(asset_tags.c.asset_id)
+                    .where(asset_tags.c.asset_id == Asset.id, asset_tags.c.tag_id == Tag.id)
+                    .exists()
+                )
+                changed += db.session.execute(asset_tags.insert().from_select(
+                    ["asset_id", "tag_id"],
+                    db.select(Asset.id, Tag.id)
+                    .join(Tag, db.true())
+                    .where(Asset.id.in_(part), Tag.id.in_(list(add_ids.values())), ~has_link),
+                )).rowcount
+                added += changed
+            if remove_ids:
+                n = db.session.execute(
+                    asset_tags.delete().where(
+                        asset_tags.c.asset_id.in_(part),
+                        asset_tags.c.tag_id.in_(remove_ids),
+                    )
+                ).rowcount
+                removed += n
+                changed += n
+            if changed:
+                search.index_assets(part)
+                changes.record(part)
+        db.session.commit()
+    except Exception:
+        current_app.logger.exception("Retag assets failed")
+        db.session.rollback()
+        return jsonify({"error": "internal"}), 500
+
+    if matched or add_ids:
+        response_cache.bump()
+        tag_index.retag(matched, add=[(i, n) for n, i in add_ids.items()], remove=remove_ids)
+    return {"ok": True, "assets": len(matched), "added": added, "removed": removed}, 200
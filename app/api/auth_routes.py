@@ -1,8 +1,12 @@
+import re
+
 from flask import Blueprint, request
+from sqlalchemy.exc import IntegrityError
 from app.models import User, db
 from app.forms import LoginForm
 from app.forms import SignUpForm
 from flask_login import current_user, login_user, logout_user, login_required
+from app import response_cache
 
 auth_routes = Blueprint('auth', __name__)
 
@@ -28,7 +32,8 @@ def login():
     form['csrf_token'].data = request.cookies['csrf_token']
     if form.validate_on_submit():
         # Add the user to the session, we are logged in!
-        user = User.query.filter(User.email == form.data['email']).first()
+        # (the form's validators already looked the user up)
+        user = form.user
         login_user(user)
         return user.to_dict()
     return form.errors, 401
@@ -43,6 +48,26 @@ def logout():
     return {'message': 'User logged out'}
 
 
+def _duplicate_user_errors(error):
+    # Postgres (psycopg2) names the violated constraint ("users_email_key");
+    # SQLite only has the message ("UNIQUE constraint failed: users.email")
+    diag = getattr(error.orig, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None)
+    if constraint:
+        field = {
+            'users_username_key': 'username',
+            'users_email_key': 'email',
+        }.get(constraint)
+    else:
+        match = re.search(r'UNIQUE constraint failed: users\.(\w+)', str(error.orig))
+        field = match and match.group(1)
+    if field == 'username':
+        return {'username': ['Username is already in use.']}
+    if field == 'email':
+        return {'email': ['Email address is already in use.']}
+    return {'errors': {'message': 'User already exists.'}}
+
+
 @auth_routes.route('/signup', methods=['POST'])
 def sign_up():
     """
@@ -57,7 +82,13 @@ def sign_up():
             password=form.data['password']
         )
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # One round trip: let the unique constraints report duplicates
+            db.session.rollback()
+            return _duplicate_user_errors(e), 401
+        response_cache.bump()
         login_user(user)
         return user.to_dict()
     return form.errors, 401
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from flask import Blueprint
+from ..models import db, Job
+
+job_routes = Blueprint("jobs", __name__)
+
+@job_routes.get("/<int:job_id>")
+def job_status(job_id):
+    """
+    GET /api/jobs/<id>
+    Status of a background job: queued | running | done | failed, with the
+    attempt count and the last error if any ("<ExceptionType>: <message>";
+    the traceback stays in the jobs table).
+    """
+    job = db.session.get(Job, job_id)
+    if not job:
+        return {"error": "not found"}, 404
+    out = job.to_dict()
+    if job.last_error:
+        # format_exc() ends with the exception line
+        out["last_error"] = job.last_error.strip().splitlines()[-1]
+    return out, 200
+
+@job_routes.get("/stats")
+def job_stats():
+    """
+    GET /api/jobs/stats
+    Job counts by status and the age in seconds of the oldest due job
+    (how far behind the workers are).
+    """
+    counts = dict(db.session.execute(
+        db.select(Job.status, db.func.count()).group_by(Job.status)
+    ).all())
+    now = datetime.utcnow()
+    oldest = db.session.execute(
+        db.select(db.func.min(Job.run_at)).where(Job.status == "queued", Job.run_at <= now)
+    ).scalar()
+    return {
+        "counts": {s: counts.get(s, 0) for s in ("queued", "running", "done", "failed")},
+        "oldest_due_seconds": (now - oldest).total_seconds() if oldest else 0,
+    }, 200
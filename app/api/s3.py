@@ -0,0 +1,207 @@
+# app/api/s3.py
+# Shared S3 plumbing for the API blueprints.
+#
+# Requires env vars on your web service:
+#   AWS_REGION (or AWS_DEFAULT_REGION)
+#   S3_BUCKET (or S3_BUCKET_NAME)
+# Optional:
+#   S3_KEY_PREFIX (e.g., "uploads")
+#   S3_PUBLIC_BASE (CDN/base URL if you front S3; otherwise it builds the standard S3 path)
+#   S3_ENDPOINT_URL (S3-compatible endpoint, e.g. a local MinIO: http://localhost:9000)
+#   S3_ADDRESSING_STYLE ("virtual" by default; MinIO usually wants "path")
+#   S3_MAX_POOL_CONNECTIONS (HTTP connections per worker, default 10; gunicorn.conf.py
+#                            raises it to the worker's thread/greenlet count)
+#   PRESIGN_CACHE_SIZE (max cached presigned GET URLs per worker, default 4096; 0 disables)
+#   PRESIGN_MIN_REMAINING (fraction of ExpiresIn a cached URL must still have, default 0.5)
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+from ..metrics import metrics
+
+# ---------- env ---------------------------------------------------------------
+
+def env(name, default=None, required=False, alt_names=None):
+    """Read env var by primary name or any alt names."""
+    alt_names = alt_names or []
+    for key in [name] + alt_names:
+        val = os.environ.get(key)
+        if val:
+            return val
+    if default is not None:
+        return default
+    if required:
+        raise RuntimeError(f"Missing env var: {name} (checked { [name] + alt_names })")
+    return None
+
+# Settings are read once per worker; a missing required var raises and is
+# therefore not cached, so it is picked up once it is set.
+@lru_cache(maxsize=None)
+def bucket_name():
+    return env("S3_BUCKET", alt_names=["S3_BUCKET_NAME"], required=True)
+
+@lru_cache(maxsize=None)
+def region():
+    # Support both common env names for region
+    return env("AWS_REGION", alt_names=["AWS_DEFAULT_REGION"], required=True)
+
+@lru_cache(maxsize=None)
+def key_prefix():
+    return (env("S3_KEY_PREFIX", "") or "").strip("/ ")
+
+def public_base():
+    """Optional override to form public-style URLs if you host behind CDN, etc."""
+    return os.environ.get("S3_PUBLIC_BASE")
+
+# ---------- client ------------------------------------------------------------
+
+# One client per worker process. boto3 clients are thread-safe once built,
+# but building one is slow (tens of ms) and the default session is not safe
+# to use concurrently, so construction happens once under a lock. The pid
+# check makes a gunicorn-forked child build its own client instead of
+# reusing the parent's connection pool. Its HTTP pool is sized for every
+# thread (or greenlet) of the worker; a smaller pool makes concurrent calls
+# open and throw away connections.
+_client_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+def get_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = boto3.client(
+                "s3",
+                region_name=region(),
+                endpoint_url=env("S3_ENDPOINT_URL"),
+                config=BotoConfig(
+                    signature_version="s3v4",
+                    s3={"addressing_style": env("S3_ADDRESSING_STYLE", "virtual")},
+                    max_pool_connections=int(env("S3_MAX_POOL_CONNECTIONS", "10")),
+                ),
+            )
+            _client_pid = pid
+    return _client
+
+def reset_client():
+    """Drop the cached client and presigned URLs (tests, credential rotation)."""
+    global _client, _client_pid
+    with _client_lock:
+        _client = None
+        _client_pid = None
+    presign_cache.clear()
+
+# ---------- presigned GET cache -----------------------------------------------
+
+class PresignCache:
+    """
+    Bounded LRU of presigned GET URLs keyed by (bucket, key).
+
+    A cached URL is handed out again only while at least `min_remaining` of
+    the requested ExpiresIn window is left (and never one that outlives the
+    requested window), so callers always get a usable link.
+    """
+
+    def __init__(self, maxsize=4096, min_remaining=0.5):
+        self.maxsize = maxsize
+        self.min_remaining = min_remaining
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # (bucket, key) -> (url, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, bucket, key, expires_in):
+        now = time.time()
+        with self._lock:
+            entry = self._items.get((bucket, key))
+            if entry is not None:
+                url, expires_at = entry
+                left = expires_at - now
+                if expires_in * self.min_remaining <= left <= expires_in:
+                    self._items.move_to_end((bucket, key))
+                    self.hits += 1
+                    return url
+            self.misses += 1
+            return None
+
+    def put(self, bucket, key, url, expires_at):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[(bucket, key)] = (url, expires_at)
+            self._items.move_to_end((bucket, key))
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._items), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+presign_cache = PresignCache(
+    maxsize=int(env("PRESIGN_CACHE_SIZE", "4096")),
+    min_remaining=float(env("PRESIGN_MIN_REMAINING", "0.5")),
+)
+
+def timed_presign(client, **kwargs):
+    """client.generate_presigned_url(**kwargs), recorded in s3_presign_seconds."""
+    t0 = time.perf_counter()
+    try:
+        return client.generate_presigned_url(**kwargs)
+    finally:
+        metrics.observe("s3_presign_seconds", time.perf_counter() - t0,
+                        method=kwargs.get("ClientMethod"))
+
+def presign_get(key, expires_in=300, bucket=None, client=None):
+    """Presigned GET URL for `key`, served from presign_cache when still fresh."""
+    bucket = bucket or bucket_name()
+    url = presign_cache.get(bucket, key, expires_in)
+    metrics.inc("s3_presign_cache_total", result="hit" if url else "miss")
+    if url is None:
+        expires_at = time.time() + expires_in
+        url = timed_presign(
+            client or get_client(),
+            ClientMethod="get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+        presign_cache.put(bucket, key, url, expires_at)
+    return url
+
+# ---------- content hashing ---------------------------------------------------
+
+def stream_sha256(key, bucket=None, client=None, chunk_size=8 * 1024 * 1024):
+    """
+    SHA-256 (hex) of an S3 object, read with ranged GETs of `chunk_size` and
+    hashed as it streams, so memory stays at one network buffer. Every range
+    is pinned to the ETag seen up front; an object replaced mid-read fails
+    with a PreconditionFailed error instead of hashing a mix of versions.
+    """
+    s3 = client or get_client()
+    bucket = bucket or bucket_name()
+    head = s3.head_object(Bucket=bucket, Key=key)
+    size, etag = head["ContentLength"], head["ETag"]
+    h = hashlib.sha256()
+    for start in range(0, size, chunk_size):
+        end = min(start + chunk_size, size) - 1
+        body = s3.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag
+        )["Body"]
+        for block in body.iter_chunks(1024 * 1024):
+            h.update(block)
+    return h.hexdigest()
@@ -1,11 +1,76 @@
-from flask import Blueprint, request, jsonify
-from ..models import db, Tag
+from flask import Blueprint, request, jsonify, current_app
+from ..models import db, Tag, asset_tags
+from .. import changes, replica, response_cache, search
+from ..tag_index import tag_index
 
 tag_routes = Blueprint("tags", __name__)
 
 @tag_routes.get("")
+@response_cache.cached_response()
+@replica.use_replica
 def list_tags():
-    return jsonify([t.to_dict() for t in Tag.query.order_by(Tag.name).all()])
+    """
+    GET /api/tags[?fields=id,name]
+    Every tag with the ids of its assets; ?fields= (id, name, assets)
+    returns only those keys (plus "id"), and skips the asset ids unless
+    "assets" is asked for.
+    """
+    raw = request.args.get("fields")
+    if raw:
+        fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+        unknown = [f for f in fields if f not in ("id", "name", "assets")]
+        if unknown:
+            return {"error": "unknown fields: " + ", ".join(unknown)}, 400
+        rows = db.session.execute(db.select(Tag.id, Tag.name).order_by(Tag.name)).all()
+        by_tag = Tag.asset_ids_by_tag() if "assets" in fields else {}
+        out = []
+        for tag_id, name in rows:
+            d = {"id": tag_id}
+            if "name" in fields:
+                d["name"] = name
+            if "assets" in fields:
+                d["assets"] = by_tag.get(tag_id, [])
+            out.append(d)
+        return jsonify(out)
+    tags = Tag.query.order_by(Tag.name).all()
+    # Two queries total regardless of tag/asset counts
+    by_tag = Tag.asset_ids_by_tag()
+    return jsonify([t.to_dict(asset_ids=by_tag.get(t.id, [])) for t in tags])
+
+def _suggest_from_db(prefix, limit):
+    # Same matching and order as tag_index.suggest
+    pattern = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    count = db.func.count(asset_tags.c.asset_id)
+    rows = db.session.execute(
+        db.select(Tag.id, Tag.name, count)
+        .outerjoin(asset_tags, asset_tags.c.tag_id == Tag.id)
+        .where(db.func.lower(Tag.name).like(pattern, escape="\\"))
+        .group_by(Tag.id, Tag.name)
+        .order_by(count.desc(), db.func.lower(Tag.name), Tag.id)
+        .limit(limit)
+    ).all()
+    return [tuple(r) for r in rows]
+
+@tag_routes.get("/suggest")
+@replica.use_replica
+def suggest_tags():
+    """
+    GET /api/tags/suggest?prefix=<text>&limit=<n>
+    Autocomplete: up to `limit` (default 10, max 50) tags whose name starts
+    with `prefix` (case-insensitive), most used first:
+    [{ "id", "name", "count" }]
+    Answered from the worker's tag index; until that is built, from SQL.
+    """
+    prefix = request.args.get("prefix", "").strip()
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), 50))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
+    tag_index.refresh_async(current_app._get_current_object())
+    found = tag_index.suggest(prefix, limit)
+    if found is None:
+        found = _suggest_from_db(prefix, limit)
+    return jsonify([{"id": i, "name": n, "count": c} for i, n, c in found])
 
 @tag_routes.post("")
 def create_tag():
@@ -19,6 +84,8 @@ def create_tag():
     t = Tag(name=name)
     db.session.add(t)
     db.session.commit()
+    response_cache.bump()
+    tag_index.put_tag(t.id, t.name)
     return t.to_dict(), 201
 
 @tag_routes.put("/<int:tag_id>")
@@ -34,14 +101,91 @@ def update_tag(tag_id):
     if Tag.query.filter(Tag.id != tag_id, Tag.name == name).first():
         return {"error": "tag name already exists"}, 400
     t.name = name
+    db.session.flush()
+    affected = search.tagged_asset_ids(tag_id)
+    search.index_assets(affected)
+    changes.record(affected)
     db.session.commit()
+    response_cache.bump()
+    tag_index.put_tag(t.id, t.name)
     return t.to_dict()
 
 @tag_routes.delete("/<int:tag_id>")
 def delete_tag(tag_id):
-    t = Tag.query.get(tag_id)
-    if not t:
+    if not db.session.execute(db.select(Tag.id).where(Tag.id == tag_id)).first():
         return {"error": "not found"}, 404
-    db.session.delete(t)
+    affected = search.tagged_asset_ids(tag_id)
+    # Set-based: deleting through the ORM would load every tagged asset
+    db.session.execute(asset_tags.delete().where(asset_tags.c.tag_id == tag_id))
+    db.session.execute(db.delete(Tag).where(Tag.id == tag_id))
+    search.index_assets(affected)
+    changes.record(affected)
     db.session.commit()
+    response_cache.bump()
+    tag_index.remove_tag(tag_id)
     return {"ok": True}
+
+@tag_routes.post("/merge")
+def merge_tags():
+    """
+    POST /api/tags/merge
+    Body: { "target": <tag id>, "sources": [<tag id>, ...] }
+    Moves every asset link from the source tags onto the target (an asset
+    that already carries the target keeps a single link) and deletes the
+    sources, in one transaction.
+    Returns { "target": {tag}, "merged": n sources, "assets": n retagged }.
+    """
+    data = request.get_json(silent=True) or {}
+    target_id, source_ids = data.get("target"), data.get("sources")
+    if not isinstance(target_id, int) or isinstance(target_id, bool):
+        return {"error": "target must be a tag id"}, 400
+    if not isinstance(source_ids, list) or not source_ids or not all(
+        isinstance(i, int) and not isinstance(i, bool) for i in source_ids
+    ):
+        return {"error": "sources must be a non-empty list of tag ids"}, 400
+    source_ids = sorted(set(source_ids))
+    if target_id in source_ids:
+        return {"error": "target cannot also be a source"}, 400
+
+    target = Tag.query.get(target_id)
+    if not target:
+        return {"error": "not found"}, 404
+    found = db.session.execute(db.select(Tag.id).where(Tag.id.in_(source_ids))).scalars().all()
+    missing = set(source_ids) - set(found)
+    if missing:
+        return {"error": "unknown source tags", "ids": sorted(missing)}, 400
+
+    try:
+        affected = db.session.execute(
+            db.select(asset_tags.c.asset_id)
+            .where(asset_tags.c.tag_id.in_(source_ids))
+            .distinct()
+        ).scalars().all()
+        # Set-based: one INSERT ... SELECT for the new links, skipping
+        # assets that already carry the target
+        has_target = (
+            db.select(asset_tags.c.asset_id)
+            .where(asset_tags.c.tag_id == target_id)
+        )
+        db.session.execute(asset_tags.insert().from_select(
+            ["asset_id", "tag_id"],
+            db.select(asset_tags.c.asset_id, db.literal(target_id))
+            .where(asset_tags.c.tag_id.in_(source_ids))
+            .where(asset_tags.c.asset_id.not_in(has_target))
+            .distinct(),
+        ))
+        db.session.execute(asset_tags.delete().where(asset_tags.c.tag_id.in_(source_ids)))
+        db.session.execute(db.delete(Tag).where(Tag.id.in_(source_ids)))
+        size = current_app.config["ASSETS_BULK_CHUNK"]
+        for i in range(0, len(affected), size):
+            search.index_assets(affected[i:i + size])
+        changes.record(affected)
+        db.session.commit()
+    except Exception:
+        current_app.logger.exception("Merge tags failed")
+        db.session.rollback()
+        return jsonify({"error": "internal"}), 500
+
+    response_cache.bump()
+    tag_index.merge_tags(target.id, target.name, source_ids)
+    return {"target": target.to_dict(with_assets=False), "merged": len(source_ids), "assets": len(affected)}, 200
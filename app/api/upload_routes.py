@@ -1,74 +1,65 @@
 # app/api/upload_routes.py
-# Requires env vars on your web service:
-#   AWS_REGION (or AWS_DEFAULT_REGION)
-#   S3_BUCKET (or S3_BUCKET_NAME)
-# Optional:
-#   S3_KEY_PREFIX (e.g., "uploads")
-#   S3_PUBLIC_BASE (CDN/base URL if you front S3; otherwise it builds the standard S3 path)
-
-import os
+# S3 env vars are documented in app/api/s3.py
+
+import math
 import mimetypes
 import time
+from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
 
+import click
+from botocore.exceptions import ClientError
 from flask import Blueprint, request, jsonify, current_app
-import boto3
-from botocore.config import Config as BotoConfig
+
+from ..models import db, Asset
+from ..assets import asset_to_dict, sha256_arg
+from .s3 import (
+    bucket_name, get_client, key_prefix, presign_get as _presign_get, public_base, region,
+    timed_presign,
+)
 
 upload_routes = Blueprint("uploads", __name__)
 
 # ---------- helpers -----------------------------------------------------------
 
-def _env(name, default=None, required=False, alt_names=None):
-    """Read env var by primary name or any alt names."""
-    alt_names = alt_names or []
-    for key in [name] + alt_names:
-        val = os.environ.get(key)
-        if val:
-            return val
-    if default is not None:
-        return default
-    if required:
-        raise RuntimeError(f"Missing env var: {name} (checked { [name] + alt_names })")
-    return None
-
 def _safe_key(filename: str) -> str:
     """
     Build an S3 object key like: <prefix>/YYYY/MM/DD/<filename>
     """
-    prefix = (_env("S3_KEY_PREFIX", "") or "").strip("/ ")
+    prefix = key_prefix()
     date_path = time.strftime("%Y/%m/%d")
     safe = quote(filename)  # URL-safe, retains dots and most ascii
     key = f"{date_path}/{safe}"
     return f"{prefix}/{key}" if prefix else key
 
-def _s3_client():
-    # Support both common env names for region
-    region = _env("AWS_REGION", alt_names=["AWS_DEFAULT_REGION"], required=True)
-    return boto3.client(
-        "s3",
-        region_name=region,
-        config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "virtual"}),
-    )
-
-def _bucket_name():
-    return _env("S3_BUCKET", alt_names=["S3_BUCKET_NAME"], required=True)
-
-def _public_base():
-    """Optional override to form public-style URLs if you host behind CDN, etc."""
-    return os.environ.get("S3_PUBLIC_BASE")
+def _content_type(filename, content_type=None):
+    if not content_type:
+        content_type, _ = mimetypes.guess_type(filename)
+    return content_type or "application/octet-stream"
 
-def _region():
-    return _env("AWS_REGION", alt_names=["AWS_DEFAULT_REGION"], required=True)
+def _existing_by_hash(sha):
+    """
+    Asset already stored with this content hash (client-supplied hex), if
+    any; raises ValueError if the hash is malformed.
+    """
+    if sha is not None and not isinstance(sha, str):
+        raise ValueError
+    sha = sha256_arg(sha)
+    if not sha:
+        return None
+    return Asset.query.filter_by(content_sha256=sha).first()
 
 # ---------- routes ------------------------------------------------------------
 
 @upload_routes.get("/s3-url")
 def presign_put():
     """
-    GET /api/uploads/s3-url?filename=<name>&contentType=<mime>
+    GET /api/uploads/s3-url?filename=<name>&contentType=<mime>[&sha256=<hex>]
 
-    Returns JSON with both new and legacy keys:
+    If sha256 matches an asset that is already stored, no upload URL is
+    issued: returns { "exists": true, "asset": {...} } instead.
+
+    Otherwise returns JSON with both new and legacy keys:
     {
       "put_url": "...", "get_url": "...",
       "uploadUrl": "...", "getUrl": "...",
@@ -77,25 +68,28 @@ def presign_put():
     }
     """
     try:
-        bucket = _bucket_name()
-        region = _region()
+        bucket = bucket_name()
 
         filename = request.args.get("filename")
         if not filename:
             return jsonify({"error": "filename is required"}), 400
 
-        content_type = request.args.get("contentType")
-        if not content_type:
-            content_type, _ = mimetypes.guess_type(filename)
-        if not content_type:
-            content_type = "application/octet-stream"
+        try:
+            existing = _existing_by_hash(request.args.get("sha256"))
+        except ValueError:
+            return jsonify({"error": "sha256 must be 64 hex characters"}), 400
+        if existing:
+            return jsonify({"exists": True, "asset": asset_to_dict(existing)}), 200
+
+        content_type = _content_type(filename, request.args.get("contentType"))
 
         key = _safe_key(filename)
-        s3 = _s3_client()
+        s3 = get_client()
 
         params = {"Bucket": bucket, "Key": key, "ContentType": content_type}
 
-        put_url = s3.generate_presigned_url(
+        put_url = timed_presign(
+            s3,
             ClientMethod="put_object",
             Params=params,
             ExpiresIn=900,   # 15 minutes
@@ -103,17 +97,13 @@ def presign_put():
         )
 
         # Presigned GET for preview/download (object may remain private)
-        get_url = s3.generate_presigned_url(
-            ClientMethod="get_object",
-            Params={"Bucket": bucket, "Key": key},
-            ExpiresIn=300,   # 5 minutes
-        )
+        get_url = _presign_get(key, 300, bucket=bucket, client=s3)   # 5 minutes
 
         # Build a plain S3 URL too (useful if you ever make objects public or front with CDN)
-        if _public_base():
-            public_url = f"{_public_base().rstrip('/')}/{key}"
+        if public_base():
+            public_url = f"{public_base().rstrip('/')}/{key}"
         else:
-            public_url = f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
+            public_url = f"https://{bucket}.s3.{region()}.amazonaws.com/{key}"
 
         return jsonify({
             # New names
@@ -130,6 +120,7 @@ def presign_put():
             # Useful metadata
             "key": key,
             "headers": {"Content-Type": content_type},
+            "exists": False,
         }), 200
 
     except Exception as e:
@@ -147,13 +138,283 @@ def presign_get():
     if not key:
         return jsonify({"error": "key is required"}), 400
     try:
-        s3 = _s3_client()
-        url = s3.generate_presigned_url(
-            ClientMethod="get_object",
-            Params={"Bucket": _bucket_name(), "Key": key},
-            ExpiresIn=300,
-        )
+        url = _presign_get(key, 300)
         return jsonify({"url": url}), 200
     except Exception as e:
         current_app.logger.exception("presign_get failed")
         return jsonify({"error": f"presign failed: {e.__class__.__name__}: {e}"}), 500
+
+
+@upload_routes.post("/get-urls")
+def presign_get_many():
+    """
+    POST /api/uploads/get-urls
+    Body: { "keys": ["<s3_key>", ...] }  or  { "asset_ids": [1, 2, ...] }
+    Returns { "urls": {"<s3_key>": "<presigned_get_url>"},
+              "assets": {"<asset_id>": "<s3_key>"},   (asset_ids only)
+              "missing": [<asset_id without a stored key>] }
+    """
+    data = request.get_json(force=True) or {}
+    keys = data.get("keys") or []
+    asset_ids = data.get("asset_ids") or []
+    if not isinstance(keys, list) or not isinstance(asset_ids, list):
+        return jsonify({"error": "keys and asset_ids must be lists"}), 400
+    if not keys and not asset_ids:
+        return jsonify({"error": "keys or asset_ids is required"}), 400
+    limit = current_app.config["PRESIGN_BATCH_MAX"]
+    if len(keys) + len(asset_ids) > limit:
+        return jsonify({"error": f"at most {limit} keys per request"}), 400
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in asset_ids):
+        return jsonify({"error": "asset_ids must be a list of integers"}), 400
+
+    try:
+        out = {}
+        if asset_ids:
+            rows = db.session.execute(
+                db.select(Asset.id, Asset.s3_key).where(Asset.id.in_(asset_ids))
+            ).all()
+            by_id = {i: k for i, k in rows if k}
+            out["assets"] = {str(i): k for i, k in by_id.items()}
+            out["missing"] = [i for i in asset_ids if i not in by_id]
+            keys = list(keys) + list(by_id.values())
+
+        s3 = get_client()
+        bucket = bucket_name()
+        out["urls"] = {
+            k: _presign_get(k, 300, bucket=bucket, client=s3)
+            for k in dict.fromkeys(k for k in keys if isinstance(k, str) and k)
+        }
+        return jsonify(out), 200
+    except Exception as e:
+        current_app.logger.exception("presign_get_many failed")
+        return jsonify({"error": f"presign failed: {e.__class__.__name__}: {e}"}), 500
+
+
+# ---------- multipart uploads -------------------------------------------------
+# Large FBX/UASSET exports: start -> presign part URLs (any number of calls,
+# parts uploaded in parallel) -> list parts to resume -> complete or abort.
+
+MIN_PART_SIZE = 5 * 1024 * 1024      # S3 minimum for every part but the last
+MAX_PARTS = 10000                    # S3 hard limit per upload
+
+def _part_size(total_size):
+    """Smallest configured part size that keeps the upload under MAX_PARTS."""
+    size = max(MIN_PART_SIZE, current_app.config["MULTIPART_PART_SIZE"])
+    if total_size:
+        size = max(size, math.ceil(total_size / MAX_PARTS))
+    return size
+
+def _upload_ref(data):
+    key = data.get("key")
+    upload_id = data.get("upload_id")
+    if not key or not upload_id:
+        raise ValueError("key and upload_id are required")
+    return key, upload_id
+
+def _list_parts(s3, bucket, key, upload_id):
+    parts = []
+    for page in s3.get_paginator("list_parts").paginate(
+        Bucket=bucket, Key=key, UploadId=upload_id
+    ):
+        parts.extend(
+            {"PartNumber": p["PartNumber"], "ETag": p["ETag"], "Size": p["Size"]}
+            for p in page.get("Parts", [])
+        )
+    return parts
+
+@upload_routes.post("/multipart")
+def multipart_start():
+    """
+    POST /api/uploads/multipart
+    Body: { "filename": "...", "contentType": "...", "size": <bytes, optional>,
+            "sha256": "<hex, optional>" }
+    Returns { "key", "upload_id", "part_size", "part_count" (when size given) },
+    or { "exists": true, "asset": {...} } if sha256 is already stored.
+    """
+    data = request.get_json(force=True) or {}
+    filename = data.get("filename")
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    try:
+        size = int(data.get("size") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "size must be an integer"}), 400
+    try:
+        try:
+            existing = _existing_by_hash(data.get("sha256"))
+        except ValueError:
+            return jsonify({"error": "sha256 must be 64 hex characters"}), 400
+        if existing:
+            return jsonify({"exists": True, "asset": asset_to_dict(existing)}), 200
+        key = _safe_key(filename)
+        res = get_client().create_multipart_upload(
+            Bucket=bucket_name(), Key=key,
+            ContentType=_content_type(filename, data.get("contentType")),
+        )
+        part_size = _part_size(size)
+        out = {"key": key, "upload_id": res["UploadId"], "part_size": part_size}
+        if size:
+            out["part_count"] = max(1, math.ceil(size / part_size))
+        return jsonify(out), 201
+    except Exception as e:
+        current_app.logger.exception("multipart_start failed")
+        return jsonify({"error": f"multipart start failed: {e.__class__.__name__}: {e}"}), 500
+
+@upload_routes.post("/multipart/part-urls")
+def multipart_part_urls():
+    """
+    POST /api/uploads/multipart/part-urls
+    Body: { "key", "upload_id", "part_numbers": [1, 2, ...] }  or  { ..., "parts": <N> }
+    Returns { "urls": {"<part_number>": "<presigned PUT url>"}, "expires_in": <s> }
+    """
+    data = request.get_json(force=True) or {}
+    urls_max = current_app.config["MULTIPART_URLS_MAX"]
+    too_many = f"at most {urls_max} parts per call"
+    out_of_range = f"part numbers must be between 1 and {MAX_PARTS}"
+    try:
+        key, upload_id = _upload_ref(data)
+        numbers = data.get("part_numbers")
+        # Bounds are checked before any collection is built from the input
+        if numbers is None:
+            parts = int(data.get("parts") or 0)
+            if parts < 1:
+                return jsonify({"error": "part_numbers or a positive parts is required"}), 400
+            if parts > MAX_PARTS:
+                return jsonify({"error": out_of_range}), 400
+            if parts > urls_max:
+                return jsonify({"error": too_many}), 400
+            numbers = range(1, parts + 1)
+        elif not isinstance(numbers, list):
+            return jsonify({"error": "part_numbers must be a list"}), 400
+        elif len(numbers) > urls_max:
+            return jsonify({"error": too_many}), 400
+        numbers = sorted({int(n) for n in numbers})
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e) or "part_numbers must be integers"}), 400
+    if not numbers:
+        return jsonify({"error": "part_numbers or parts is required"}), 400
+    if numbers[0] < 1 or numbers[-1] > MAX_PARTS:
+        return jsonify({"error": out_of_range}), 400
+
+    try:
+        s3 = get_client()
+        bucket = bucket_name()
+        expires = current_app.config["MULTIPART_URL_EXPIRES"]
+        urls = {
+            str(n): timed_presign(
+                s3,
+                ClientMethod="upload_part",
+                Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": n},
+                ExpiresIn=expires,
+                HttpMethod="PUT",
+            )
+            for n in numbers
+        }
+        return jsonify({"urls": urls, "expires_in": expires}), 200
+    except Exception as e:
+        current_app.logger.exception("multipart_part_urls failed")
+        return jsonify({"error": f"presign failed: {e.__class__.__name__}: {e}"}), 500
+
+@upload_routes.get("/multipart/parts")
+def multipart_parts():
+    """
+    GET /api/uploads/multipart/parts?key=<s3_key>&upload_id=<id>
+    Parts S3 already has, for resuming: { "parts": [{PartNumber, ETag, Size}] }
+    """
+    try:
+        key, upload_id = _upload_ref(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        parts = _list_parts(get_client(), bucket_name(), key, upload_id)
+        return jsonify({"parts": parts}), 200
+    except Exception as e:
+        current_app.logger.exception("multipart_parts failed")
+        return jsonify({"error": f"list parts failed: {e.__class__.__name__}: {e}"}), 500
+
+@upload_routes.post("/multipart/complete")
+def multipart_complete():
+    """
+    POST /api/uploads/multipart/complete
+    Body: { "key", "upload_id", "parts": [{"PartNumber": 1, "ETag": "..."}] }
+    "parts" may be omitted to complete with every part S3 has received.
+    Returns { "key", "get_url" }
+    """
+    data = request.get_json(force=True) or {}
+    try:
+        key, upload_id = _upload_ref(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        s3 = get_client()
+        bucket = bucket_name()
+        parts = data.get("parts") or _list_parts(s3, bucket, key, upload_id)
+        parts = sorted(
+            ({"PartNumber": int(p["PartNumber"]), "ETag": p["ETag"]} for p in parts),
+            key=lambda p: p["PartNumber"],
+        )
+        if not parts:
+            return jsonify({"error": "no parts uploaded"}), 400
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        return jsonify({"key": key, "get_url": _presign_get(key, 300, bucket=bucket, client=s3)}), 200
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "parts must be [{PartNumber, ETag}]"}), 400
+    except Exception as e:
+        current_app.logger.exception("multipart_complete failed")
+        return jsonify({"error": f"complete failed: {e.__class__.__name__}: {e}"}), 500
+
+@upload_routes.post("/multipart/abort")
+def multipart_abort():
+    """
+    POST /api/uploads/multipart/abort
+    Body: { "key", "upload_id" }
+    404 if the upload is unknown, or already completed or aborted.
+    """
+    data = request.get_json(force=True) or {}
+    try:
+        key, upload_id = _upload_ref(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        get_client().abort_multipart_upload(Bucket=bucket_name(), Key=key, UploadId=upload_id)
+        return jsonify({"ok": True}), 200
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchUpload":
+            return jsonify({"error": "no such upload"}), 404
+        current_app.logger.exception("multipart_abort failed")
+        return jsonify({"error": f"abort failed: {e.__class__.__name__}: {e}"}), 500
+    except Exception as e:
+        current_app.logger.exception("multipart_abort failed")
+        return jsonify({"error": f"abort failed: {e.__class__.__name__}: {e}"}), 500
+
+def abort_stale_multipart(older_than, dry_run=False):
+    """Abort multipart uploads under S3_KEY_PREFIX started before now - older_than."""
+    s3 = get_client()
+    bucket = bucket_name()
+    cutoff = datetime.now(timezone.utc) - older_than
+    prefix = key_prefix()
+    aborted = []
+    for page in s3.get_paginator("list_multipart_uploads").paginate(
+        Bucket=bucket, Prefix=f"{prefix}/" if prefix else ""
+    ):
+        for up in page.get("Uploads", []):
+            if up["Initiated"] >= cutoff:
+                continue
+            if not dry_run:
+                s3.abort_multipart_upload(Bucket=bucket, Key=up["Key"], UploadId=up["UploadId"])
+            aborted.append((up["Key"], up["UploadId"]))
+    return aborted
+
+# Creates the `flask uploads cleanup-multipart` command
+@upload_routes.cli.command("cleanup-multipart")
+@click.option("--older-than-hours", default=24, show_default=True, type=float)
+@click.option("--dry-run", is_flag=True, help="Only list what would be aborted.")
+def cleanup_multipart_command(older_than_hours, dry_run):
+    """Abort multipart uploads that were started but never completed."""
+    aborted = abort_stale_multipart(timedelta(hours=older_than_hours), dry_run=dry_run)
+    for key, upload_id in aborted:
+        click.echo(f"{'would abort' if dry_run else 'aborted'} {key} ({upload_id})")
+    click.echo(f"{len(aborted)} stale multipart upload(s)")
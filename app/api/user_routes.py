@@ -1,12 +1,15 @@
 from flask import Blueprint, jsonify
 from flask_login import login_required
 from app.models import User
+from app import replica, response_cache
 
 user_routes = Blueprint('users', __name__)
 
 
 @user_routes.route('/')
 @login_required
+@response_cache.cached_response()
+@replica.use_replica
 def users():
     """
     Query for all users and returns them in a list of user dictionaries
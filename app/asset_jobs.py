@@ -0,0 +1,158 @@
+# app/asset_jobs.py
+# Asset work that runs off the request path: the background job handlers
+# (hash verification, FBX metadata extraction, S3 object deletes) and the
+# `flask assets extract-fbx` / `fbx-info` commands. The commands are added
+# to the assets blueprint's CLI group in app/__init__.py.
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .models import db, Asset
+from .api.s3 import bucket_name, get_client, stream_sha256
+from .assets import delete_objects
+from . import changes, fbx, jobs, response_cache
+
+
+def record_sha256(a):
+    """
+    Hash a's S3 object and store the digest on it.
+    Returns (digest, id of another asset with that content or None, matched_claim).
+    A duplicate keeps no hash: the digest is the other asset's, and the
+    client's claim is unverified.
+    """
+    digest = stream_sha256(a.s3_key)
+    dup = Asset.query.filter(Asset.content_sha256 == digest, Asset.id != a.id).first()
+    if dup:
+        if a.content_sha256 is not None:
+            a.content_sha256 = None
+            changes.record([a.id])
+            db.session.commit()
+            response_cache.bump()
+        return digest, dup.id, False
+    matched = a.content_sha256 in (None, digest)
+    if a.content_sha256 != digest:
+        a.content_sha256 = digest
+        changes.record([a.id])
+        db.session.commit()
+        response_cache.bump()
+    return digest, None, matched
+
+
+@jobs.handler("asset.verify_hash")
+def _verify_hash_job(payload):
+    a = db.session.get(Asset, payload["asset_id"])
+    if a is None or not a.s3_key:
+        return  # deleted (or detached from S3) since it was queued
+    digest, dup_id, matched = record_sha256(a)
+    if dup_id:
+        current_app.logger.warning("Asset %s has the same content as asset %s", a.id, dup_id)
+    elif not matched:
+        current_app.logger.warning("Asset %s content_sha256 claim did not match; corrected", a.id)
+
+
+@jobs.handler("asset.extract_fbx")
+def _extract_fbx_job(payload):
+    a = db.session.get(Asset, payload["asset_id"])
+    if a is None or not a.s3_key:
+        return
+    src = fbx.S3Source(a.s3_key)
+    try:
+        meta = fbx.extract(src)
+    except fbx.FBXError as e:
+        # Not retryable: the file itself is not a readable FBX
+        current_app.logger.warning("Asset %s: FBX metadata skipped (%s)", a.id, e)
+        return
+    finally:
+        src.close()
+    for col, value in meta.items():
+        setattr(a, col, value)
+    changes.record([a.id])
+    db.session.commit()
+    response_cache.bump()
+
+
+@jobs.handler("asset.delete_object")
+def _delete_object_job(payload):
+    key = payload["key"]
+    # Another asset may still point at the same object
+    if db.session.execute(db.select(Asset.id).where(Asset.s3_key == key).limit(1)).first():
+        return
+    get_client().delete_object(Bucket=bucket_name(), Key=key)
+
+
+@jobs.handler("asset.delete_objects")
+def _delete_objects_job(payload):
+    keys = payload["keys"]
+    in_use = set(db.session.execute(
+        db.select(Asset.s3_key).where(Asset.s3_key.in_(keys))
+    ).scalars())
+    # S3 deletes are idempotent, so a retry simply resends the whole batch
+    failed = delete_objects([k for k in keys if k not in in_use])
+    if failed:
+        raise RuntimeError(f"S3 refused {len(failed)} of {len(keys)} deletes, e.g. {failed[0]!r}")
+
+
+# ---------- FBX metadata backfill ---------------------------------------------
+
+_FBX_COLUMNS = ("fbx_version", "polygon_count", "mesh_count", "material_count", "bone_count")
+
+
+# The `flask assets extract-fbx` command
+@click.command("extract-fbx")
+@click.option("--all", "redo", is_flag=True, help="Re-extract assets that already have metadata.")
+@click.option("--workers", default=os.cpu_count() or 2, show_default=True, type=click.IntRange(1))
+@click.option("--batch-size", default=200, show_default=True, type=click.IntRange(1))
+@with_appcontext
+def extract_fbx_command(redo, workers, batch_size):
+    """Backfill FBX metadata columns for S3-stored .fbx assets."""
+    t = Asset.__table__
+    update = t.update().where(t.c.id == db.bindparam("_id")).values(
+        {c: db.bindparam(c) for c in _FBX_COLUMNS})
+    q = db.select(Asset.id, Asset.s3_key).where(db.func.lower(Asset.s3_key).like("%.fbx"))
+    if not redo:
+        q = q.where(Asset.fbx_version.is_(None))
+
+    # Pool workers only read S3 and parse; all DB writes stay in this process
+    db.engine.dispose()
+    done = failed = 0
+    last_id = 0
+    with ProcessPoolExecutor(workers) as pool:
+        while True:
+            batch = db.session.execute(
+                q.where(Asset.id > last_id).order_by(Asset.id).limit(batch_size)).all()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            rows = []
+            results = pool.map(fbx.extract_s3, [key for _, key in batch])
+            for (asset_id, key), (meta, error) in zip(batch, results):
+                if error:
+                    failed += 1
+                    click.echo(f"asset {asset_id} {key}: {error}", err=True)
+                else:
+                    rows.append(dict(meta, _id=asset_id))
+            if rows:
+                db.session.execute(update, rows)
+                changes.record([r["_id"] for r in rows])
+            db.session.commit()
+            done += len(rows)
+            click.echo(f"{done} extracted, {failed} failed (through asset {last_id})")
+    if done:
+        response_cache.bump()
+
+
+# The `flask assets fbx-info` command
+@click.command("fbx-info")
+@click.argument("location")
+@with_appcontext
+def fbx_info_command(location):
+    """Print FBX metadata for a local file or an S3 key."""
+    try:
+        click.echo(json.dumps(fbx.extract_metadata(location), indent=2))
+    except fbx.FBXError as e:
+        raise click.ClickException(f"{location}: {e}")
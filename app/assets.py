@@ -0,0 +1,80 @@
+# app/assets.py
+# Asset helpers shared by the API routes, the background job handlers
+# (asset_jobs.py) and the bucket reconciliation (reconcile.py): the JSON
+# shape of an asset, client hash validation and set-wise deletes of asset
+# rows and S3 objects.
+
+import re
+
+from flask import current_app
+
+from .models import db, Asset, asset_tags
+from . import changes, search
+from .api.s3 import bucket_name, get_client
+
+
+def asset_to_dict(a):
+    # Fail-safe serializer (don’t call S3 here)
+    return {
+        "id": a.id,
+        "name": getattr(a, "name", None),
+        "description": getattr(a, "description", None),
+        "url": getattr(a, "url", None),               # if you store public URL
+        "s3_key": getattr(a, "s3_key", None),         # if you store S3 key
+        "content_type": getattr(a, "content_type", None),
+        "content_sha256": getattr(a, "content_sha256", None),
+        "fbx_version": getattr(a, "fbx_version", None),
+        "polygon_count": getattr(a, "polygon_count", None),
+        "mesh_count": getattr(a, "mesh_count", None),
+        "material_count": getattr(a, "material_count", None),
+        "bone_count": getattr(a, "bone_count", None),
+        "tags": [t.name for t in getattr(a, "tags", [])],
+        "created_at": (getattr(a, "created_at", None).isoformat()
+                       if getattr(a, "created_at", None) else None),
+    }
+
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def sha256_arg(value):
+    """Normalize a client-supplied hex SHA-256; raises ValueError if malformed."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    if not _SHA256.match(value):
+        raise ValueError("content_sha256 must be 64 hex characters")
+    return value
+
+
+def is_fbx(key):
+    return bool(key) and key.lower().endswith(".fbx")
+
+
+def chunks(items):
+    size = current_app.config["ASSETS_BULK_CHUNK"]
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def delete_asset_rows(ids):
+    """Unindex and delete assets and their tag links by id; the caller commits."""
+    for part in chunks(ids):
+        search.unindex_assets(part)
+        changes.record(part)
+        db.session.execute(asset_tags.delete().where(asset_tags.c.asset_id.in_(part)))
+        db.session.execute(db.delete(Asset).where(Asset.id.in_(part)))
+
+
+def delete_objects(keys):
+    """delete_objects in batches of 1000; returns the keys S3 refused."""
+    s3 = get_client()
+    bucket = bucket_name()
+    failed = []
+    for i in range(0, len(keys), 1000):
+        res = s3.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": k} for k in keys[i:i + 1000]], "Quiet": True},
+        )
+        failed.extend(e["Key"] for e in res.get("Errors", []))
+    return failed
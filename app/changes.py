@@ -0,0 +1,83 @@
+# app/changes.py
+# Change log behind GET /api/assets/changes (incremental editor sync).
+#
+# Every write path that creates, updates, retags or deletes assets calls
+# record() with their ids inside its own transaction, like the search index
+# (asset_routes / tag_routes). The log only says *which* assets changed; the
+# feed answers with their current rows, and an id with no row left is a
+# delete (the log row is its tombstone). A client keeps the cursor from its
+# last response and gets O(changes) rows back, never the whole catalog.
+#
+# The cursor is asset_changes.id. A reader must never see id N before every
+# id below N has committed, or it would skip the late ones:
+#   SQLite:   writers are serialized by the database lock, which the
+#             transaction already holds when it gets here
+#   Postgres: record() takes a transaction-scoped advisory lock first, so
+#             logging transactions get their ids (and commit) one at a time
+#
+# `flask changes compact` drops rows superseded by a newer row for the same
+# asset; cursors taken before compaction stay valid.
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from .models import db, AssetChange
+
+changes_commands = AppGroup("changes")
+
+# pg_advisory_xact_lock key for the change log (b"assetch")
+_PG_LOCK_KEY = 0x61737365746368
+
+
+def record(asset_ids):
+    """Log assets as changed; call before commit."""
+    asset_ids = list(dict.fromkeys(asset_ids))
+    if not asset_ids:
+        return
+    if db.session.get_bind().dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+    db.session.execute(db.insert(AssetChange), [{"asset_id": i} for i in asset_ids])
+
+
+def read(since, limit):
+    """
+    Assets changed after cursor `since`, at most `limit` log rows:
+    (asset ids in change order, next cursor, has_more).
+    """
+    rows = db.session.execute(
+        db.select(AssetChange.id, AssetChange.asset_id)
+        .where(AssetChange.id > since)
+        .order_by(AssetChange.id)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], since, False
+    # An asset changed twice in the page is listed once, at its last change
+    last = {asset_id: change_id for change_id, asset_id in rows}
+    return sorted(last, key=last.get), rows[-1][0], has_more
+
+
+def compact():
+    """Delete log rows superseded by a newer one for the same asset; returns the count."""
+    latest = (
+        db.select(db.func.max(AssetChange.id))
+        .group_by(AssetChange.asset_id)
+        .scalar_subquery()
+    )
+    return db.session.execute(
+        db.delete(AssetChange)
+        .where(AssetChange.id.not_in(latest))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+# Creates the `flask changes compact` command
+@changes_commands.command("compact")
+def compact_command():
+    """Drop superseded asset change log rows."""
+    n = compact()
+    db.session.commit()
+    click.echo(f"{n} superseded change(s) removed")
@@ -2,35 +2,27 @@
 import os
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
-class Config:
-    SECRET_KEY = os.environ.get("SECRET_KEY", "dev-key-change-me")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-
-    _is_prod = (os.environ.get("FLASK_ENV") == "production") or bool(os.environ.get("RENDER"))
-    SQLALCHEMY_ECHO = False if _is_prod else True
-
-    # Base DB URL (SQLite locally by default)
-    _DB_URL = os.environ.get("DATABASE_URL", "sqlite:///dev.db")
-
+def _normalize_db_url(url, is_prod):
+    """Driver, sslmode and port fixes shared by the primary and replica URLs."""
     # Normalize old Heroku scheme
-    if _DB_URL.startswith("postgres://"):
-        _DB_URL = _DB_URL.replace("postgres://", "postgresql://", 1)
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
 
     # Choose driver: psycopg2 (stable) for Postgres
-    if _DB_URL.startswith("postgresql://"):
-        _DB_URL = _DB_URL.replace("postgresql://", "postgresql+psycopg2://", 1)
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
 
     # Add sslmode in production
-    if _DB_URL.startswith("postgresql+psycopg2://") and _is_prod:
-        p = urlparse(_DB_URL)
+    if url.startswith("postgresql+psycopg2://") and is_prod:
+        p = urlparse(url)
         q = dict(parse_qsl(p.query))
         q.setdefault("sslmode", "require")
-        _DB_URL = urlunparse(p._replace(query=urlencode(q)))
+        url = urlunparse(p._replace(query=urlencode(q)))
         
    #Fix for no port identity     
             # Force default Postgres port if it’s missing (helps avoid odd TLS paths)
-    if _DB_URL.startswith("postgresql+psycopg2://"):
-        p = urlparse(_DB_URL)
+    if url.startswith("postgresql+psycopg2://"):
+        p = urlparse(url)
         if p.port is None and p.hostname:
             netloc = p.netloc
             # Preserve userinfo if present, just add :5432 to the host part
@@ -42,30 +34,101 @@ class Config:
             else:
                 if ':' not in netloc:
                     netloc = f"{netloc}:5432"
-            _DB_URL = urlunparse(p._replace(netloc=netloc))
+            url = urlunparse(p._replace(netloc=netloc))
 
+    return url
 
 
-
-    SQLALCHEMY_DATABASE_URI = _DB_URL
-
-    # Engine options: Postgres gets a pool; SQLite gets none (or simple defaults)
-    if SQLALCHEMY_DATABASE_URI.startswith("postgresql+psycopg2://"):
-        SQLALCHEMY_ENGINE_OPTIONS = {
+def _engine_options(url, pool_size, max_overflow):
+    if url.startswith("postgresql+psycopg2://"):
+        return {
             "pool_pre_ping": True,
             "pool_recycle": 300,
-            "pool_size": 5,
-            "max_overflow": 5,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
             "pool_timeout": 10,
         }
-    else:
-        # SQLite: avoid pool kwargs that cause TypeError
-        SQLALCHEMY_ENGINE_OPTIONS = {
-            # If you need multi-threaded access you could also add:
-            # "connect_args": {"check_same_thread": False}
+    # SQLite: avoid pool kwargs that cause TypeError
+    # If you need multi-threaded access you could also add:
+    # "connect_args": {"check_same_thread": False}
+    return {}
+
+
+class Config:
+    SECRET_KEY = os.environ.get("SECRET_KEY", "dev-key-change-me")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    _is_prod = (os.environ.get("FLASK_ENV") == "production") or bool(os.environ.get("RENDER"))
+    SQLALCHEMY_ECHO = False if _is_prod else True
+
+    # Base DB URL (SQLite locally by default)
+    _DB_URL = _normalize_db_url(os.environ.get("DATABASE_URL", "sqlite:///dev.db"), _is_prod)
+
+    SQLALCHEMY_DATABASE_URI = _DB_URL
+
+    # Optional read replica for the read-only endpoints; see app/replica.py
+    _REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+    if _REPLICA_URL:
+        _REPLICA_URL = _normalize_db_url(_REPLICA_URL, _is_prod)
+    # After a client writes, its reads stay on the primary this long (replica lag budget)
+    DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))
+
+    # Asset listing: default/max page size and NDJSON stream fetch size
+    ASSETS_PAGE_SIZE = int(os.environ.get("ASSETS_PAGE_SIZE", 100))
+    ASSETS_MAX_PAGE_SIZE = int(os.environ.get("ASSETS_MAX_PAGE_SIZE", 1000))
+    ASSETS_STREAM_CHUNK = int(os.environ.get("ASSETS_STREAM_CHUNK", 500))
+    # Rows per commit for POST /api/assets/bulk
+    ASSETS_BULK_CHUNK = int(os.environ.get("ASSETS_BULK_CHUNK", 500))
+    # Max keys + asset ids per POST /api/uploads/get-urls
+    PRESIGN_BATCH_MAX = int(os.environ.get("PRESIGN_BATCH_MAX", 500))
+
+    # Multipart uploads: default part size, part URL lifetime, URLs per call
+    MULTIPART_PART_SIZE = int(os.environ.get("MULTIPART_PART_SIZE", 64 * 1024 * 1024))
+    MULTIPART_URL_EXPIRES = int(os.environ.get("MULTIPART_URL_EXPIRES", 3600))
+    MULTIPART_URLS_MAX = int(os.environ.get("MULTIPART_URLS_MAX", 1000))
+
+    # Response encoder: "orjson" when installed, else "stdlib"; see app/json_provider.py
+    JSON_ENCODER = os.environ.get("JSON_ENCODER", "orjson")
+
+    # Shared (cross-worker) response cache for read endpoints; see app/response_cache.py
+    RESPONSE_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+
+    # Prometheus metrics at /api/metrics; see app/metrics.py
+    METRICS_MODE = os.environ.get("METRICS_MODE", "full")
+    METRICS_PATH = os.environ.get("METRICS_PATH")
+    METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+    # Background jobs and `flask worker`; see app/jobs.py
+    JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", 5))
+    JOBS_VISIBILITY_TIMEOUT = int(os.environ.get("JOBS_VISIBILITY_TIMEOUT", 300))
+    JOBS_BACKOFF_BASE = float(os.environ.get("JOBS_BACKOFF_BASE", 10))
+    JOBS_BACKOFF_MAX = float(os.environ.get("JOBS_BACKOFF_MAX", 3600))
+    JOBS_KEEP_DAYS = float(os.environ.get("JOBS_KEEP_DAYS", 7))
+    WORKER_POOL = os.environ.get("WORKER_POOL", "thread")
+    WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", 4))
+    WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", 1))
+
+    # Engine options: Postgres gets a pool; SQLite gets none (or simple defaults).
+    # Writes (uploads, moderation) and replica reads get separate pools so
+    # read traffic cannot starve the primary.
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 5)),
+    )
+    SQLALCHEMY_BINDS = {}
+    if _REPLICA_URL:
+        SQLALCHEMY_BINDS["replica"] = {
+            "url": _REPLICA_URL,
+            **_engine_options(
+                _REPLICA_URL,
+                pool_size=int(os.environ.get("DB_REPLICA_POOL_SIZE", 10)),
+                max_overflow=int(os.environ.get("DB_REPLICA_MAX_OVERFLOW", 10)),
+            ),
         }
-        
-        
+
+
 # ---- DEBUG OUTPUT ----
 if os.getenv("RENDER"):
     try:
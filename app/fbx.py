@@ -0,0 +1,380 @@
+# app/fbx.py
+# Streaming FBX metadata extraction (version, mesh/material/bone counts,
+# polygon count) for binary and ASCII FBX files.
+#
+# Binary files are walked record by record: every node header carries the
+# offset of its end, so whole subtrees (vertex arrays, animation takes,
+# embedded textures...) are skipped with a seek and never read. Only the
+# header, the Objects children's property lists and each mesh's
+# PolygonVertexIndex array are fetched. Sources read by offset, so the same
+# parser runs over a local file or an S3 object fetched with ranged GETs.
+#
+# ASCII files have no offsets and are streamed once, line by line.
+
+import os
+import re
+import struct
+import zlib
+from collections import OrderedDict
+
+BINARY_MAGIC = b"Kaydara FBX Binary  \x00"
+_HEADER_LEN = 27            # magic (21) + 0x1a 0x00 + uint32 version
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+
+# Property type code -> fixed size; S/R are length-prefixed, lowercase are arrays
+_SCALAR_SIZE = {b"Y": 2, b"C": 1, b"I": 4, b"F": 4, b"D": 8, b"L": 8}
+_SCALAR_FMT = {b"Y": "<h", b"C": "<?", b"I": "<i", b"F": "<f", b"D": "<d", b"L": "<q"}
+
+
+class FBXError(ValueError):
+    pass
+
+
+# ---------- sources -----------------------------------------------------------
+
+class FileSource:
+    """Random access to a local file."""
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        self.size = os.fstat(self._f.fileno()).st_size
+
+    def read(self, offset, n):
+        self._f.seek(offset)
+        return self._f.read(n)
+
+    def stream(self, offset, n, chunk_size=1024 * 1024):
+        while n > 0:
+            data = self.read(offset, min(n, chunk_size))
+            if not data:
+                return
+            yield data
+            offset += len(data)
+            n -= len(data)
+
+    def close(self):
+        self._f.close()
+
+
+class S3Source:
+    """
+    Random access to an S3 object through ranged GETs. Small reads go
+    through a few cached blocks so walking consecutive node headers costs one
+    request per block; every range is pinned to the ETag seen up front.
+    """
+
+    def __init__(self, key, bucket=None, client=None, block_size=256 * 1024, max_blocks=8):
+        from .api.s3 import bucket_name, get_client
+
+        self.s3 = client or get_client()
+        self.bucket = bucket or bucket_name()
+        self.key = key
+        head = self.s3.head_object(Bucket=self.bucket, Key=key)
+        self.size, self.etag = head["ContentLength"], head["ETag"]
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.requests = 1
+        self._blocks = OrderedDict()
+
+    def _get(self, start, end):
+        self.requests += 1
+        return self.s3.get_object(
+            Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end}", IfMatch=self.etag
+        )["Body"]
+
+    def _block(self, i):
+        data = self._blocks.get(i)
+        if data is None:
+            start = i * self.block_size
+            end = min(start + self.block_size, self.size) - 1
+            data = self._get(start, end).read()
+            self._blocks[i] = data
+            if len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(i)
+        return data
+
+    def read(self, offset, n):
+        n = max(0, min(n, self.size - offset))
+        if n > self.block_size * 2:
+            return b"".join(self.stream(offset, n))
+        out = []
+        while n > 0:
+            i, skip = divmod(offset, self.block_size)
+            piece = self._block(i)[skip:skip + n]
+            if not piece:
+                break
+            out.append(piece)
+            offset += len(piece)
+            n -= len(piece)
+        return b"".join(out)
+
+    def stream(self, offset, n, chunk_size=1024 * 1024):
+        # Large payloads (mesh index arrays) bypass the block cache: one GET
+        n = max(0, min(n, self.size - offset))
+        if n:
+            yield from self._get(offset, offset + n - 1).iter_chunks(chunk_size)
+
+    def close(self):
+        self._blocks.clear()
+
+
+def open_source(location):
+    """A FileSource for an existing local path, otherwise an S3Source for the key."""
+    if os.path.exists(location):
+        return FileSource(location)
+    return S3Source(location)
+
+
+# ---------- binary ------------------------------------------------------------
+
+def _properties(data, count):
+    """Decode a scalar/string property list; arrays are returned as None."""
+    out, pos = [], 0
+    for _ in range(count):
+        code = data[pos:pos + 1]
+        pos += 1
+        if code in _SCALAR_SIZE:
+            out.append(struct.unpack_from(_SCALAR_FMT[code], data, pos)[0])
+            pos += _SCALAR_SIZE[code]
+        elif code in (b"S", b"R"):
+            (length,) = struct.unpack_from("<I", data, pos)
+            pos += 4
+            raw = data[pos:pos + length]
+            out.append(raw.decode("utf-8", "replace") if code == b"S" else raw)
+            pos += length
+        elif code in (b"f", b"d", b"l", b"i", b"b"):
+            _, _, compressed = struct.unpack_from("<III", data, pos)
+            pos += 12 + compressed
+            out.append(None)
+        else:
+            raise FBXError(f"unknown property type {code!r}")
+    return out
+
+
+def _count_polygon_ends(chunks, encoding):
+    """
+    Number of polygons in a PolygonVertexIndex int32 array: each polygon's
+    last index is stored negated, so count the int32s with the sign bit set
+    (the high byte of each little-endian word), streaming and inflating as
+    the bytes arrive.
+    """
+    inflate = zlib.decompressobj() if encoding == 1 else None
+    count, phase = 0, 0     # phase: byte position within the current int32
+
+    def tally(data):
+        nonlocal count, phase
+        high = data[(3 - phase) % 4::4]
+        count += len(high) - len(high.translate(None, _HIGH_BYTES))
+        phase = (phase + len(data)) % 4
+
+    for chunk in chunks:
+        tally(inflate.decompress(chunk) if inflate else chunk)
+    if inflate:
+        tally(inflate.flush())
+    return count
+
+
+class _BinaryReader:
+    def __init__(self, src, version):
+        self.src = src
+        wide = version >= 7500
+        self.header = struct.Struct("<QQQB" if wide else "<IIIB")
+
+    def node(self, offset):
+        """(name, props_offset, prop_count, prop_len, end) or None at a null record."""
+        raw = self.src.read(offset, self.header.size + 255)
+        if len(raw) < self.header.size:
+            raise FBXError("truncated node record")
+        end, count, plen, nlen = self.header.unpack_from(raw)
+        if end == 0:
+            return None
+        if end <= offset or end > self.src.size:
+            raise FBXError("corrupt node record")
+        name = raw[self.header.size:self.header.size + nlen].decode("ascii", "replace")
+        return name, offset + self.header.size + nlen, count, plen, end
+
+    def children(self, start, end):
+        pos = start
+        while pos < end:
+            node = self.node(pos)
+            if node is None:
+                return
+            yield node
+            pos = node[4]
+
+    def properties(self, node):
+        _, at, count, plen, _ = node
+        return _properties(self.src.read(at, plen), count)
+
+    def polygons(self, mesh):
+        """Polygon count of a mesh node (0 if it has no PolygonVertexIndex)."""
+        for child in self.children(mesh[1] + mesh[3], mesh[4]):
+            if child[0] != "PolygonVertexIndex":
+                continue
+            at = child[1]
+            head = self.src.read(at, 13)
+            if head[:1] != b"i":
+                raise FBXError("PolygonVertexIndex is not an int32 array")
+            _, encoding, compressed = struct.unpack_from("<III", head, 1)
+            return _count_polygon_ends(self.src.stream(at + 13, compressed), encoding)
+        return 0
+
+
+def _parse_binary(src):
+    (version,) = struct.unpack("<I", src.read(23, 4))
+    r = _BinaryReader(src, version)
+    meta = {"fbx_version": version, "polygon_count": 0, "mesh_count": 0,
+            "material_count": 0, "bone_count": 0}
+    # 7.x keeps mesh data in Geometry objects; 6.x inlines it in "Mesh" Models
+    mesh_node = "Geometry" if version >= 7000 else "Model"
+
+    for top in r.children(_HEADER_LEN, src.size):
+        if top[0] != "Objects":
+            continue
+        for obj in r.children(top[1] + top[3], top[4]):
+            name = obj[0]
+            if name == "Material":
+                meta["material_count"] += 1
+            elif name in ("Model", "Geometry"):
+                # The object's class is its last property ("LimbNode", "Mesh", ...)
+                props = r.properties(obj)
+                kind = props[-1] if props else None
+                if name == "Model" and kind in ("LimbNode", "Limb"):
+                    meta["bone_count"] += 1
+                elif name == mesh_node and kind == "Mesh":
+                    meta["mesh_count"] += 1
+                    meta["polygon_count"] += r.polygons(obj)
+        break   # Objects is the only node we need
+    return meta
+
+
+# ---------- ASCII -------------------------------------------------------------
+
+_ASCII_VERSION = re.compile(r";\s*FBX\s+(\d+)\.(\d+)\.(\d+)")
+_ASCII_NODE = re.compile(r"^(\w+):\s*(.*?)\s*(\{)?$")
+_QUOTED = re.compile(r'"([^"]*)"')
+
+
+def _lines(src, chunk_size=1024 * 1024):
+    tail = b""
+    for chunk in src.stream(0, src.size, chunk_size):
+        tail += chunk
+        *lines, tail = tail.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", "replace").strip()
+    if tail:
+        yield tail.decode("utf-8", "replace").strip()
+
+
+def _parse_ascii(src):
+    meta = {"fbx_version": None, "polygon_count": 0, "mesh_count": 0,
+            "material_count": 0, "bone_count": 0}
+    stack = []              # names of the open { } blocks
+    in_indices = False      # inside a mesh's PolygonVertexIndex values
+    mesh_models = 0         # 6.x has no Geometry objects, only "Mesh" Models
+
+    for line in _lines(src):
+        if not line:
+            continue
+        if line.startswith(";"):
+            m = _ASCII_VERSION.match(line)
+            if m and meta["fbx_version"] is None:
+                meta["fbx_version"] = int(m.group(1)) * 1000 + int(m.group(2)) * 100 + int(m.group(3))
+            continue
+
+        if in_indices:
+            # 7.x: "a: 0,1,-3" (possibly wrapped) then "}"; 6.x: wrapped "0,1,-3" lines
+            values = line[2:].lstrip() if line.startswith("a:") else line
+            if values and values[0] in "-0123456789,":
+                meta["polygon_count"] += values.count("-")
+                continue
+            in_indices = False
+
+        if line.startswith("}"):
+            if stack:
+                stack.pop()
+            continue
+
+        m = _ASCII_NODE.match(line)
+        if not m:
+            continue
+        name, rest, opens = m.groups()
+        parent = stack[-1] if stack else None
+        if name == "FBXVersion" and parent == "FBXHeaderExtension":
+            meta["fbx_version"] = int(rest)
+        elif parent == "Objects":
+            kind = (_QUOTED.findall(rest) or [None])[-1]
+            if name == "Material":
+                meta["material_count"] += 1
+            elif name == "Model" and kind in ("LimbNode", "Limb"):
+                meta["bone_count"] += 1
+            elif name == "Model" and kind == "Mesh":
+                mesh_models += 1
+                name = "Mesh"
+            elif name == "Geometry" and kind == "Mesh":
+                meta["mesh_count"] += 1
+                name = "Mesh"
+        elif name == "PolygonVertexIndex" and parent == "Mesh":
+            in_indices = True
+            if not rest.startswith("*"):     # 6.x keeps the first values inline
+                meta["polygon_count"] += rest.count("-")
+        if opens:
+            stack.append(name)
+
+    if meta["fbx_version"] is None:
+        raise FBXError("no FBX version found")
+    if meta["fbx_version"] < 7000:
+        meta["mesh_count"] = mesh_models
+    return meta
+
+
+# ---------- entry points --------------------------------------------------------
+
+def extract(src):
+    """
+    {"fbx_version", "polygon_count", "mesh_count", "material_count",
+    "bone_count"} for an open source. Raises FBXError for anything that is
+    not a readable FBX file.
+    """
+    head = src.read(0, 1024)
+    try:
+        if head.startswith(BINARY_MAGIC):
+            if len(head) < _HEADER_LEN:
+                raise FBXError("truncated header")
+            return _parse_binary(src)
+        if head.lstrip().startswith(b";") or b"FBXHeaderExtension" in head:
+            return _parse_ascii(src)
+    except FBXError:
+        raise
+    except (struct.error, zlib.error, ValueError) as e:
+        # Truncated or corrupt data surfaces as whatever the decoder hit first
+        raise FBXError(f"{type(e).__name__}: {e}") from e
+    raise FBXError("not an FBX file")
+
+
+def extract_metadata(location):
+    """extract() for a local path or an S3 key."""
+    src = open_source(location)
+    try:
+        return extract(src)
+    finally:
+        src.close()
+
+
+def extract_s3(key):
+    """
+    Process-pool entry point for backfills: (metadata, None), or (None, error)
+    for objects that are missing or not FBX. Needs only the S3 env vars.
+    """
+    try:
+        src = S3Source(key)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    try:
+        return extract(src), None
+    except FBXError as e:
+        return None, f"{type(e).__name__}: {e}"
+    finally:
+        src.close()
@@ -5,18 +5,18 @@ from app.models import User
 
 
 def user_exists(form, field):
-    # Checking if user exists
+    # Checking if user exists; the user is kept on the form so the password
+    # check and the login route don't query for it again
     email = field.data
-    user = User.query.filter(User.email == email).first()
-    if not user:
+    form.user = User.query.filter(User.email == email).first()
+    if not form.user:
         raise ValidationError('Email provided not found.')
 
 
 def password_matches(form, field):
     # Checking if password matches
     password = field.data
-    email = form.data['email']
-    user = User.query.filter(User.email == email).first()
+    user = getattr(form, 'user', None)
     if not user:
         raise ValidationError('No such user exists.')
     if not user.check_password(password):
@@ -24,5 +24,7 @@ def password_matches(form, field):
 
 
 class LoginForm(FlaskForm):
+    user = None
+
     email = StringField('email', validators=[DataRequired(), user_exists])
-    password = StringField('password', validators=[DataRequired(), password_matches])
\ No newline at end of file
+    password = StringField('password', validators=[DataRequired(), password_matches])
@@ -0,0 +1,302 @@
+# app/jobs.py
+# Durable background jobs backed by the `jobs` table (no external broker).
+#
+# Request handlers call enqueue() inside their own transaction, so a job
+# exists if and only if the change that asked for it committed. `flask
+# worker` claims due jobs in batches, runs them on a thread or process pool
+# and records the outcome:
+#   - a claim leases the job for JOBS_VISIBILITY_TIMEOUT seconds; the worker
+#     renews leases while jobs run, and a job whose worker died becomes
+#     claimable again once its lease lapses
+#   - a failed attempt is retried after an exponential backoff (with jitter)
+#     until max_attempts, then the job is marked failed with its last error
+#
+# Handlers are plain functions registered with @handler("kind"); they get
+# the job payload and run inside an app context.
+#
+# Config:
+#   JOBS_MAX_ATTEMPTS        attempts before a job is marked failed (default 5)
+#   JOBS_VISIBILITY_TIMEOUT  lease length in seconds (default 300)
+#   JOBS_BACKOFF_BASE        first retry delay in seconds, doubled per attempt (default 10)
+#   JOBS_BACKOFF_MAX         cap on the retry delay (default 3600)
+#   JOBS_KEEP_DAYS           finished jobs are pruned after this many days (default 7)
+#   WORKER_POOL              "thread" (default) or "process"
+#   WORKER_CONCURRENCY       jobs run at once per `flask worker` (default 4)
+#   WORKER_POLL_SECONDS      idle wait between claims (default 1)
+
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .metrics import metrics
+from .models import db, Job
+
+_handlers = {}
+
+# The app inside a pool process, set by _init_process
+_worker_app = None
+
+
+def handler(kind):
+    """Register fn(payload) as the handler for jobs of `kind`."""
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(kind, payload=None, delay=0, max_attempts=None):
+    """
+    Add a job to the current session; it is committed (or rolled back) with
+    the caller's transaction. Returns the Job (id is set after flush).
+    """
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or current_app.config["JOBS_MAX_ATTEMPTS"],
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.session.add(job)
+    return job
+
+
+def enqueue_many(kind, payloads):
+    """enqueue() for many payloads as one executemany INSERT."""
+    if not payloads:
+        return
+    now = datetime.utcnow()
+    max_attempts = current_app.config["JOBS_MAX_ATTEMPTS"]
+    db.session.execute(db.insert(Job), [
+        {"kind": kind, "payload": p, "status": "queued", "attempts": 0,
+         "max_attempts": max_attempts, "run_at": now}
+        for p in payloads
+    ])
+
+
+# ---- claiming and leases ---------------------------------------------------
+
+def claim(worker_id, limit, visibility):
+    """
+    Lease up to `limit` due jobs (queued and due, or running with a lapsed
+    lease) to this worker. Returns [(job_id, token)].
+    """
+    now = datetime.utcnow()
+    token = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+    due = (
+        db.select(Job.id)
+        .where(db.or_(
+            db.and_(Job.status == "queued", Job.run_at <= now),
+            db.and_(Job.status == "running", Job.locked_until < now),
+        ))
+        .order_by(Job.run_at)
+        .limit(limit)
+        # Postgres: concurrent workers skip each other's rows instead of
+        # blocking; SQLite serializes writers anyway and ignores this
+        .with_for_update(skip_locked=True)
+    )
+    db.session.execute(
+        db.update(Job)
+        .where(Job.id.in_(due))
+        .values(status="running", locked_by=token,
+                locked_until=now + timedelta(seconds=visibility),
+                attempts=Job.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    ids = db.session.execute(db.select(Job.id).where(Job.locked_by == token)).scalars().all()
+    return [(i, token) for i in ids]
+
+
+def renew(leases, visibility):
+    """Extend the lease on jobs this worker is still running."""
+    if not leases:
+        return
+    until = datetime.utcnow() + timedelta(seconds=visibility)
+    for token in {t for _, t in leases}:
+        ids = [i for i, t in leases if t == token]
+        db.session.execute(
+            db.update(Job)
+            .where(Job.id.in_(ids), Job.locked_by == token, Job.status == "running")
+            .values(locked_until=until)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+
+
+def backoff(attempts):
+    base = current_app.config["JOBS_BACKOFF_BASE"]
+    delay = min(current_app.config["JOBS_BACKOFF_MAX"], base * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _finish(job_id, token, **values):
+    # Only the lease holder may record an outcome; a worker whose lease
+    # lapsed and was re-claimed elsewhere changes nothing
+    res = db.session.execute(
+        db.update(Job)
+        .where(Job.id == job_id, Job.locked_by == token, Job.status == "running")
+        .values(locked_by=None, locked_until=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    if res.rowcount == 0:
+        current_app.logger.warning("Job %s lost its lease; outcome dropped", job_id)
+
+
+def run_job(job_id, token):
+    """Run one leased job and record done / retry / failed."""
+    job = db.session.get(Job, job_id)
+    if job is None or job.locked_by != token:
+        return
+    kind, payload = job.kind, job.payload
+    attempts, max_attempts = job.attempts, job.max_attempts
+    if attempts > max_attempts:
+        # Re-claimed after its lease lapsed on the final attempt
+        _finish(job_id, token, status="failed", finished_at=datetime.utcnow(),
+                last_error=job.last_error or "visibility timeout exceeded")
+        return
+    db.session.commit()   # end the read transaction before running
+
+    t0 = time.perf_counter()
+    try:
+        fn = _handlers.get(kind)
+        if fn is None:
+            raise LookupError(f"no handler for job kind {kind!r}")
+        fn(payload)
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc(limit=5)
+        current_app.logger.warning("Job %s (%s) attempt %d failed", job_id, kind, attempts)
+        metrics.inc("jobs_total", kind=kind, result="error")
+        if attempts >= max_attempts:
+            _finish(job_id, token, status="failed", last_error=error,
+                    finished_at=datetime.utcnow())
+        else:
+            _finish(job_id, token, status="queued", last_error=error,
+                    run_at=datetime.utcnow() + timedelta(seconds=backoff(attempts)))
+    else:
+        metrics.inc("jobs_total", kind=kind, result="ok")
+        _finish(job_id, token, status="done", finished_at=datetime.utcnow())
+    finally:
+        metrics.observe("job_duration_seconds", time.perf_counter() - t0, kind=kind)
+        metrics.maybe_flush()
+        db.session.remove()
+
+
+def prune(keep_days):
+    """Delete finished jobs older than keep_days."""
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+    res = db.session.execute(
+        db.delete(Job)
+        .where(Job.status.in_(("done", "failed")), Job.finished_at < cutoff)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return res.rowcount
+
+
+# ---- pool entry points -------------------------------------------------------
+
+def _run_in_thread(app, job_id, token):
+    with app.app_context():
+        run_job(job_id, token)
+
+
+def _init_process():
+    global _worker_app
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # A forked child already has the app; a spawned one (the macOS and
+    # Windows default) imports it here, registering the handlers with it
+    from . import app
+    _worker_app = app
+    # Connections inherited from a forking parent must not be used by the child
+    with _worker_app.app_context():
+        db.engine.dispose(close=False)
+
+
+def _run_in_process(job_id, token):
+    with _worker_app.app_context():
+        run_job(job_id, token)
+
+
+# ---- `flask worker` ------------------------------------------------------------
+
+@click.command("worker")
+@click.option("--pool", type=click.Choice(["thread", "process"]), default=None,
+              help="Run jobs on threads or processes (default: WORKER_POOL).")
+@click.option("--concurrency", type=click.IntRange(1), default=None,
+              help="Jobs run at once (default: WORKER_CONCURRENCY).")
+@click.option("--burst", is_flag=True, help="Exit once no job is due.")
+@with_appcontext
+def worker_command(pool, concurrency, burst):
+    """Run background jobs from the jobs table."""
+    app = current_app._get_current_object()
+    cfg = app.config
+    pool = pool or cfg["WORKER_POOL"]
+    concurrency = concurrency or cfg["WORKER_CONCURRENCY"]
+    visibility = cfg["JOBS_VISIBILITY_TIMEOUT"]
+    poll = cfg["WORKER_POLL_SECONDS"]
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"[:48]
+
+    if pool == "process":
+        db.engine.dispose()
+        executor = ProcessPoolExecutor(concurrency, initializer=_init_process)
+        submit = lambda job_id, token: executor.submit(_run_in_process, job_id, token)
+    else:
+        executor = ThreadPoolExecutor(concurrency, thread_name_prefix="job")
+        submit = lambda job_id, token: executor.submit(_run_in_thread, app, job_id, token)
+
+    stopping = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stopping.set())
+
+    click.echo(f"worker {worker_id}: pool={pool} concurrency={concurrency}")
+    inflight = {}   # future -> (job_id, token)
+    last_renew = last_prune = time.monotonic()
+    try:
+        while not stopping.is_set():
+            claimed = []
+            free = concurrency - len(inflight)
+            if free > 0:
+                claimed = claim(worker_id, free, visibility)
+                for job_id, token in claimed:
+                    inflight[submit(job_id, token)] = (job_id, token)
+
+            now = time.monotonic()
+            if now - last_renew >= visibility / 3:
+                renew(list(inflight.values()), visibility)
+                last_renew = now
+            if now - last_prune >= 3600:
+                prune(cfg["JOBS_KEEP_DAYS"])
+                last_prune = now
+            metrics.maybe_flush()
+
+            if burst and not claimed and not inflight:
+                break
+            if not inflight:
+                stopping.wait(poll)
+                continue
+            # Every slot is busy or nothing else is due: sleep until a job
+            # finishes (freeing a slot) or the poll interval passes
+            done, _ = wait(inflight, timeout=poll, return_when=FIRST_COMPLETED)
+            for f in done:
+                inflight.pop(f)
+                if f.exception():
+                    app.logger.error("Job runner crashed", exc_info=f.exception())
+    finally:
+        click.echo(f"worker {worker_id}: finishing {len(inflight)} running job(s)")
+        executor.shutdown(wait=True)
+        metrics.flush()
@@ -0,0 +1,58 @@
+# app/json_provider.py
+# JSON encoding for every response (jsonify() and dicts returned by views).
+#
+# With orjson installed (`pip install orjson`; optional, not in
+# requirements.txt) responses are encoded in C straight to bytes, and
+# datetimes are written natively as ISO 8601. Without it the stdlib encoder
+# is used, also writing datetimes as ISO 8601 (Flask's default would be an
+# HTTP date), so column-projected rows (?fields=) can carry raw datetime
+# values and look the same either way. Keys are sorted in both, as Flask
+# does by default.
+#
+# Config:
+#   JSON_ENCODER  "orjson" (default; falls back to stdlib if not installed) or "stdlib"
+
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+class JSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(JSONProvider):
+    def _dumpb(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        # Options orjson has no equivalent for go through the stdlib
+        if set(kwargs) - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        return self._dumpb(obj, bool(kwargs.get("indent"))).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            self._dumpb(obj, indent) + b"\n", mimetype=self.mimetype
+        )
+
+
+def init_app(app):
+    use_orjson = orjson is not None and app.config["JSON_ENCODER"] == "orjson"
+    app.json = (OrjsonProvider if use_orjson else JSONProvider)(app)
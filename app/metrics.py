@@ -0,0 +1,268 @@
+# app/metrics.py
+# Prometheus metrics for /api/metrics, aggregated across gunicorn workers.
+#
+# Each worker records into plain in-memory dicts (no I/O on the request
+# path) and every METRICS_FLUSH_SECONDS adds its deltas into a SQLite file
+# shared by all workers on the host. /api/metrics flushes its own worker and
+# renders the totals from that file in Prometheus text format.
+#
+# Config:
+#   METRICS_MODE          "full" (default), "light" (request latency and SQL
+#                         statement counts only) or "off"
+#   METRICS_PATH          shared SQLite file (default: temp dir, one per database URL)
+#   METRICS_FLUSH_SECONDS how often a worker publishes its deltas (default 5)
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from .models import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+# name -> (type, help, buckets)
+SPECS = {
+    "http_request_duration_seconds": (
+        "histogram", "Request latency by endpoint.", LATENCY_BUCKETS),
+    "http_request_db_statements": (
+        "histogram", "SQL statements executed per request.", COUNT_BUCKETS),
+    "db_statement_seconds_total": (
+        "counter", "Time spent executing SQL, by endpoint.", None),
+    "db_pool_checkout_wait_seconds": (
+        "histogram", "Time spent waiting for a pooled DB connection, by pool.", LATENCY_BUCKETS),
+    "db_pool_statement_seconds": (
+        "histogram", "SQL statement latency by pool (primary / replica).", LATENCY_BUCKETS),
+    "s3_presign_seconds": (
+        "histogram", "Latency of S3 presign calls (cache misses).", LATENCY_BUCKETS),
+    "s3_presign_cache_total": (
+        "counter", "Presigned GET URL cache lookups by result.", None),
+    "job_duration_seconds": (
+        "histogram", "Background job run time by kind.", LATENCY_BUCKETS),
+    "jobs_total": (
+        "counter", "Background job attempts by kind and result.", None),
+}
+
+
+def _series(name, labels, extra=""):
+    inner = ",".join(p for p in (labels, extra) if p)
+    return f"{name}{{{inner}}}" if inner else name
+
+
+def _labels(**labels):
+    return ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in sorted(labels.items())
+    )
+
+
+class Metrics:
+    def __init__(self):
+        self.mode = "off"
+        self.path = None
+        self.flush_seconds = 5
+        self._lock = threading.Lock()
+        self._pending = {}       # (name, labels, le) -> value delta
+        self._last_flush = time.monotonic()
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    # ---- recording (in memory) ---------------------------------------------
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        k = (name, _labels(**labels), "")
+        with self._lock:
+            self._pending[k] = self._pending.get(k, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        lbl = _labels(**labels)
+        le = "+Inf"
+        for b in SPECS[name][2]:
+            if value <= b:
+                le = repr(float(b))
+                break
+        with self._lock:
+            p = self._pending
+            for k, v in (((name, lbl, le), 1), ((name, lbl, "_sum"), value),
+                         ((name, lbl, "_count"), 1)):
+                p[k] = p.get(k, 0) + v
+
+    # ---- shared store --------------------------------------------------------
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS samples (name TEXT NOT NULL, labels TEXT NOT NULL,"
+                " le TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (name, labels, le))"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO samples (name, labels, le, value) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (name, labels, le) DO UPDATE SET value = value + excluded.value",
+                [(n, lbl, le, v) for (n, lbl, le), v in pending.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def render(self):
+        """All workers' totals in Prometheus text exposition format."""
+        self.flush()
+        rows = self._conn().execute("SELECT name, labels, le, value FROM samples").fetchall()
+        by_series = {}
+        for name, lbl, le, value in rows:
+            by_series.setdefault(name, {}).setdefault(lbl, {})[le] = value
+
+        out = []
+        for name, (kind, help_text, buckets) in SPECS.items():
+            series = by_series.get(name)
+            if not series:
+                continue
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for lbl, values in sorted(series.items()):
+                if kind == "counter":
+                    out.append(f"{_series(name, lbl)} {values.get('', 0)}")
+                    continue
+                cumulative = 0
+                for b in buckets:
+                    cumulative += values.get(repr(float(b)), 0)
+                    le = 'le="%s"' % b
+                    out.append(f"{_series(name + '_bucket', lbl, le)} {int(cumulative)}")
+                cumulative += values.get("+Inf", 0)
+                le = 'le="+Inf"'
+                out.append(f"{_series(name + '_bucket', lbl, le)} {int(cumulative)}")
+                out.append(f"{_series(name + '_sum', lbl)} {values.get('_sum', 0)}")
+                out.append(f"{_series(name + '_count', lbl)} {int(values.get('_count', 0))}")
+        return "\n".join(out) + "\n"
+
+    # ---- wiring --------------------------------------------------------------
+
+    def init_app(self, app):
+        self.mode = app.config["METRICS_MODE"]
+        self.flush_seconds = app.config["METRICS_FLUSH_SECONDS"]
+        self.path = app.config.get("METRICS_PATH")
+        if not self.path:
+            db_id = hashlib.sha1(app.config["SQLALCHEMY_DATABASE_URI"].encode()).hexdigest()[:12]
+            self.path = os.path.join(tempfile.gettempdir(), f"assetshub-metrics-{db_id}.sqlite3")
+        if not self.enabled:
+            return
+
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+        with app.app_context():
+            engines = dict(db.engines)
+        # One pool per bind: None is the primary, "replica" the read replica
+        for key, engine in engines.items():
+            pool = key or "primary"
+            if self.mode == "full":
+                event.listen(engine, "before_cursor_execute", _before_cursor)
+                event.listen(engine, "after_cursor_execute", _after_cursor_for(pool))
+                _time_pool_checkout(engine.pool, pool)
+                event.listen(engine, "engine_disposed",
+                             lambda e, pool=pool: _time_pool_checkout(e.pool, pool))
+            else:
+                event.listen(engine, "before_cursor_execute", _count_cursor)
+
+
+metrics = Metrics()
+
+
+# ---- request hooks -----------------------------------------------------------
+
+def _start_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_sql = 0
+    g._metrics_sql_seconds = 0.0
+
+
+def _finish_request(response):
+    start = g.pop("_metrics_start", None)
+    if start is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.observe(
+        "http_request_duration_seconds", time.perf_counter() - start,
+        endpoint=endpoint, method=request.method, status=response.status_code,
+    )
+    metrics.observe("http_request_db_statements", g.get("_metrics_sql", 0), endpoint=endpoint)
+    if metrics.mode == "full":
+        metrics.inc("db_statement_seconds_total", g.get("_metrics_sql_seconds", 0.0),
+                    endpoint=endpoint)
+    metrics.maybe_flush()
+    return response
+
+
+# ---- SQLAlchemy hooks --------------------------------------------------------
+
+def _count_cursor(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g._metrics_sql = g.get("_metrics_sql", 0) + 1
+
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+    _count_cursor(conn, cursor, statement, parameters, context, executemany)
+
+
+def _after_cursor_for(pool):
+    def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_t0")
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        metrics.observe("db_pool_statement_seconds", elapsed, pool=pool)
+        if has_request_context():
+            g._metrics_sql_seconds = g.get("_metrics_sql_seconds", 0.0) + elapsed
+    return _after_cursor
+
+
+def _time_pool_checkout(pool, name):
+    # SQLAlchemy has no "before checkout" pool event, so time Pool.connect()
+    # itself; the Engine looks it up on the pool instance for every checkout.
+    if getattr(pool, "_metrics_wrapped", False):
+        return
+    connect = pool.connect
+
+    def timed_connect():
+        t0 = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            metrics.observe("db_pool_checkout_wait_seconds", time.perf_counter() - t0, pool=name)
+
+    pool.connect = timed_connect
+    pool._metrics_wrapped = True
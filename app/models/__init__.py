@@ -3,5 +3,8 @@ from .db import db, environment, SCHEMA
 from .user import User
 from .tag import Tag
 from .asset import Asset, asset_tags
+from .job import Job
+from .change import AssetChange
 
-__all__ = ["db", "environment", "SCHEMA", "User", "Tag", "Asset", "asset_tags"]
+__all__ = ["db", "environment", "SCHEMA", "User", "Tag", "Asset", "asset_tags", "Job",
+           "AssetChange"]
@@ -3,8 +3,12 @@ from sqlalchemy.sql import func
 
 asset_tags = db.Table(
     "asset_tags",
-    db.Column("asset_id", db.Integer, db.ForeignKey("assets.id"), primary_key=True),
-    db.Column("tag_id", db.Integer, db.ForeignKey("tags.id"), primary_key=True),
+    db.Column("asset_id", db.Integer, db.ForeignKey("assets.id", ondelete="CASCADE"),
+              primary_key=True),
+    db.Column("tag_id", db.Integer, db.ForeignKey("tags.id", ondelete="CASCADE"),
+              primary_key=True),
+    # The primary key serves lookups by asset; this one by tag
+    db.Index("ix_asset_tags_tag_id", "tag_id", "asset_id"),
 )
 
 class Asset(db.Model):
@@ -12,12 +16,27 @@ class Asset(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
+    # Case-insensitive name lookups use ix_assets_name_lower (below)
     description = db.Column(db.Text)
     url = db.Column(db.String(2048))
-    created_at = db.Column(db.DateTime, server_default=func.now())
+    s3_key = db.Column(db.String(1024), index=True)
+    content_type = db.Column(db.String(255))
+    # SHA-256 of the stored file (hex); unique so re-exports are detected
+    content_sha256 = db.Column(db.String(64), unique=True, index=True)
+    # FBX metadata, filled in by the asset.extract_fbx job (see app/fbx.py)
+    fbx_version = db.Column(db.Integer, index=True)
+    polygon_count = db.Column(db.Integer, index=True)
+    mesh_count = db.Column(db.Integer, index=True)
+    material_count = db.Column(db.Integer, index=True)
+    bone_count = db.Column(db.Integer, index=True)
+    created_at = db.Column(db.DateTime, server_default=func.now(), index=True)
     updated_at = db.Column(db.DateTime, onupdate=func.now())
 
-    tags = db.relationship("Tag", secondary=asset_tags, back_populates="assets")
+    # selectin: loading N assets costs one extra IN query for all their tags
+    # instead of one lazy query per asset
+    tags = db.relationship(
+        "Tag", secondary=asset_tags, back_populates="assets", lazy="selectin"
+    )
 
     def to_dict(self, with_tags=True):
         d = {
@@ -25,9 +44,20 @@ class Asset(db.Model):
             "name": self.name,
             "description": self.description,
             "url": self.url,
+            "s3_key": self.s3_key,
+            "content_type": self.content_type,
+            "content_sha256": self.content_sha256,
+            "fbx_version": self.fbx_version,
+            "polygon_count": self.polygon_count,
+            "mesh_count": self.mesh_count,
+            "material_count": self.material_count,
+            "bone_count": self.bone_count,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
         if with_tags:
             d["tags"] = [t.to_dict(with_assets=False) for t in self.tags]
         return d
+
+
+db.Index("ix_assets_name_lower", func.lower(Asset.name))
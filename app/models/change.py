@@ -0,0 +1,14 @@
+from .db import db
+from sqlalchemy.sql import func
+
+class AssetChange(db.Model):
+    """One asset created, updated, retagged or deleted; see app/changes.py."""
+    __tablename__ = "asset_changes"
+    # Latest row per asset, for compaction
+    __table_args__ = (db.Index("ix_asset_changes_asset_id", "asset_id", "id"),)
+
+    # The change feed cursor: ids are handed out in commit order
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key: rows outlive the asset and serve as its tombstone
+    asset_id = db.Column(db.Integer, nullable=False)
+    changed_at = db.Column(db.DateTime, server_default=func.now())
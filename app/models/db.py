@@ -1,11 +1,27 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 
 import os
 environment = os.getenv("FLASK_ENV")
 SCHEMA = os.environ.get("SCHEMA")
 
 
-db = SQLAlchemy()
+class RoutingSession(Session):
+    """
+    Sends statements to the "replica" bind while session.info["use_replica"]
+    is set (see app/replica.py). Flushes always go to the primary, and a
+    session that has written stays there.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get("use_replica") and not self._flushing:
+            replica = self._db.engines.get("replica")
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # helper function for adding prefix to foreign key column references in production
 def add_prefix_for_prod(attr):
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from .db import db
 
 class Tag(db.Model):
@@ -8,8 +10,26 @@ class Tag(db.Model):
 
     assets = db.relationship("Asset", secondary="asset_tags", back_populates="tags")
 
-    def to_dict(self, with_assets=True):
+    @staticmethod
+    def asset_ids_by_tag(tag_ids=None):
+        """
+        {tag_id: [asset_id, ...]} straight from asset_tags in one query, so
+        listing tags never loads Asset rows. tag_ids=None means every tag.
+        """
+        from .asset import asset_tags
+
+        q = db.select(asset_tags.c.tag_id, asset_tags.c.asset_id)
+        if tag_ids is not None:
+            q = q.where(asset_tags.c.tag_id.in_(list(tag_ids)))
+        out = defaultdict(list)
+        for tag_id, asset_id in db.session.execute(q.order_by(asset_tags.c.asset_id)):
+            out[tag_id].append(asset_id)
+        return out
+
+    def to_dict(self, with_assets=True, asset_ids=None):
         d = {"id": self.id, "name": self.name}
         if with_assets:
-            d["assets"] = [a.id for a in self.assets]
+            if asset_ids is None:
+                asset_ids = Tag.asset_ids_by_tag([self.id])[self.id]
+            d["assets"] = asset_ids
         return d
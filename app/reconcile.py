@@ -0,0 +1,196 @@
+# app/reconcile.py
+# `flask assets reconcile`: diff the S3 bucket against assets.s3_key.
+#
+# Reports objects no asset points at (orphans) and assets whose object is
+# gone (dangling), and with --delete-orphans / --delete-dangling removes
+# those older than --min-age-hours. Progress is checkpointed per bucket and
+# prefix, so an interrupted run over a large bucket resumes where it left
+# off.
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask.cli import with_appcontext
+
+from .models import db, Asset
+from .api.s3 import bucket_name, get_client, key_prefix
+from .assets import delete_asset_rows, delete_objects
+from . import response_cache
+from .tag_index import tag_index
+
+
+def _prefix_end(prefix):
+    """Smallest key sorting after every key that starts with `prefix` (None: no bound)."""
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _s3_key_bytewise():
+    # S3 lists keys in UTF-8 byte order; compare the same way in the DB so
+    # key ranges line up (Postgres uses ix_assets_s3_key_c for this)
+    if db.engine.dialect.name == "postgresql":
+        return Asset.s3_key.collate("C")
+    return Asset.s3_key
+
+
+def _assets_by_key(lo, hi=None, end=None, batch=1000):
+    """
+    (id, s3_key, created_at) for assets with lo < (s3_key, id) and
+    s3_key <= hi (or < end), in byte order. lo is a (key, id) cursor; id None
+    means strictly after key. Each batch is fetched in full before it is
+    yielded, so callers may write between batches.
+    """
+    col = _s3_key_bytewise()
+    key, last_id = lo
+    while True:
+        if last_id is None:
+            q = db.select(Asset.id, Asset.s3_key, Asset.created_at).where(col > key)
+        else:
+            q = db.select(Asset.id, Asset.s3_key, Asset.created_at).where(
+                db.or_(col > key, db.and_(col == key, Asset.id > last_id))
+            )
+        if hi is not None:
+            q = q.where(col <= hi)
+        elif end is not None:
+            q = q.where(col < end)
+        rows = db.session.execute(q.order_by(col, Asset.id).limit(batch)).all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch:
+            return
+        last_id, key = rows[-1][0], rows[-1][1]
+
+
+def reconcile_bucket(start_after=None, page_size=1000):
+    """
+    Diff the bucket under S3_KEY_PREFIX against assets.s3_key.
+
+    Walks list_objects_v2 pages and, for each page, reads only the asset rows
+    whose key falls in that page's key range, so memory is bounded by the
+    page size however large the bucket or table is. Yields dicts of
+      orphans:  [(key, size, last_modified)] objects no asset points at
+      dangling: [(asset_id, key, created_at)] assets whose object is gone
+      through:  last key fully checked (a resume point), or None while a
+                page's asset rows are still being read
+    """
+    s3 = get_client()
+    prefix = key_prefix()
+    prefix = f"{prefix}/" if prefix else ""
+    end = _prefix_end(prefix)
+
+    params = {"Bucket": bucket_name(), "Prefix": prefix,
+              "PaginationConfig": {"PageSize": page_size}}
+    if start_after:
+        params["StartAfter"] = start_after
+    # (prefix, -1) includes a key equal to the prefix itself
+    lo = (start_after, None) if start_after else (prefix, -1)
+    for page in s3.get_paginator("list_objects_v2").paginate(**params):
+        objs = page.get("Contents", [])
+        if page.get("IsTruncated") and not objs:
+            continue
+        hi = objs[-1]["Key"] if page.get("IsTruncated") else None
+
+        keys = {o["Key"] for o in objs}
+        matched = set()
+        for rows in _assets_by_key(lo, hi, end, page_size):
+            dangling = []
+            for asset_id, key, created_at in rows:
+                if key in keys:
+                    matched.add(key)
+                else:
+                    dangling.append((asset_id, key, created_at))
+            if dangling:
+                yield {"orphans": [], "dangling": dangling, "through": None}
+        orphans = [(o["Key"], o["Size"], o["LastModified"])
+                   for o in objs if o["Key"] not in matched]
+        through = objs[-1]["Key"] if objs else lo[0]
+        yield {"orphans": orphans, "dangling": [], "through": through}
+        lo = (hi, None)
+
+
+def _delete_assets(ids):
+    """Delete assets (and their tag links) by id in one transaction."""
+    delete_asset_rows(ids)
+    db.session.commit()
+    response_cache.bump()
+    tag_index.invalidate()
+
+
+def _reconcile_checkpoint_path(bucket, prefix):
+    scope = hashlib.sha1(f"{bucket}/{prefix}".encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"assetshub-reconcile-{scope}.json")
+
+
+# The `flask assets reconcile` command
+@click.command("reconcile")
+@click.option("--delete-orphans", is_flag=True, help="Delete S3 objects no asset points at.")
+@click.option("--delete-dangling", is_flag=True, help="Delete assets whose S3 object is missing.")
+@click.option("--min-age-hours", default=24, show_default=True, type=float,
+              help="Never delete objects or assets newer than this (uploads in flight).")
+@click.option("--page-size", default=1000, show_default=True, type=click.IntRange(1, 1000))
+@click.option("--checkpoint", type=click.Path(dir_okay=False),
+              help="Progress file (default: one per bucket/prefix in the temp dir).")
+@click.option("--restart", is_flag=True, help="Ignore a saved checkpoint and start over.")
+@with_appcontext
+def reconcile_command(delete_orphans, delete_dangling, min_age_hours, page_size,
+                      checkpoint, restart):
+    """Report (or fix) S3 objects without assets and assets without S3 objects."""
+    bucket, prefix = bucket_name(), key_prefix()
+    checkpoint = checkpoint or _reconcile_checkpoint_path(bucket, prefix)
+    state = {"bucket": bucket, "prefix": prefix, "through": None,
+             "orphans": 0, "dangling": 0, "deleted_objects": 0, "deleted_assets": 0}
+    if not restart and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            saved = json.load(f)
+        if (saved.get("bucket"), saved.get("prefix")) == (bucket, prefix):
+            state = saved
+            click.echo(f"resuming after {state['through']!r}")
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+    for batch in reconcile_bucket(state["through"], page_size):
+        stale = []
+        for asset_id, key, created_at in batch["dangling"]:
+            # created_at is naive UTC (server default)
+            old = created_at is None or created_at.replace(tzinfo=timezone.utc) < cutoff
+            if delete_dangling and old:
+                stale.append(asset_id)
+            click.echo(f"dangling asset {asset_id} {key}"
+                       + ("" if old or not delete_dangling else " (recent, kept)"))
+        state["dangling"] += len(batch["dangling"])
+        if stale:
+            _delete_assets(stale)
+            state["deleted_assets"] += len(stale)
+
+        stale = []
+        for key, size, modified in batch["orphans"]:
+            old = modified < cutoff
+            if delete_orphans and old:
+                stale.append(key)
+            click.echo(f"orphan object {key} ({size} bytes)"
+                       + ("" if old or not delete_orphans else " (recent, kept)"))
+        state["orphans"] += len(batch["orphans"])
+        if stale:
+            failed = delete_objects(stale)
+            for key in failed:
+                click.echo(f"could not delete {key}", err=True)
+            state["deleted_objects"] += len(stale) - len(failed)
+
+        if batch["through"] is not None:
+            state["through"] = batch["through"]
+            tmp = checkpoint + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, checkpoint)
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    click.echo(
+        f"{state['orphans']} orphan object(s), {state['dangling']} dangling asset(s); "
+        f"deleted {state['deleted_objects']} object(s), {state['deleted_assets']} asset(s)"
+    )
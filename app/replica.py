@@ -0,0 +1,89 @@
+# app/replica.py
+# Read-replica routing for the read-only endpoints.
+#
+# With DATABASE_REPLICA_URL set, views wrapped in @use_replica read through
+# the "replica" bind, which has its own pool (Config.SQLALCHEMY_BINDS);
+# everything else, and any write a replica view happens to make, goes to
+# the primary (RoutingSession in app/models/db.py).
+#
+# Read-your-writes: a request that writes marks its client with a short-lived
+# cookie, and that client's reads stay on the primary for
+# DB_REPLICA_STICKY_SECONDS so it never reads from a replica that has not
+# caught up with its own change. Replica reads made within that window after
+# any write are not stored in the shared response cache (app/response_cache.py).
+#
+# Config:
+#   DATABASE_REPLICA_URL       replica database (unset: everything uses the primary)
+#   DB_REPLICA_STICKY_SECONDS  primary-only window after a write (default 5)
+#   DB_REPLICA_POOL_SIZE       replica pool size (default 10)
+#   DB_REPLICA_MAX_OVERFLOW    replica pool overflow (default 10)
+#   DB_POOL_SIZE / DB_MAX_OVERFLOW  primary pool (default 5 / 5)
+
+import math
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from .models import db
+from .models.db import RoutingSession
+
+STICKY_COOKIE = "db_primary_until"
+
+
+def enabled():
+    return "replica" in db.engines
+
+
+def _sticky():
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def use_replica(view):
+    """Run a read-only view against the replica unless this client just wrote."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if enabled() and not _sticky():
+            db.session.info["use_replica"] = True
+            g.db_replica_read = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _wrote(session):
+    session.info["use_replica"] = False
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    _wrote(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _after_execute(state):
+    # Core-style writes (session.execute(update(...))) never flush
+    if state.is_insert or state.is_update or state.is_delete:
+        _wrote(state.session)
+
+
+def _mark_sticky(response):
+    if g.pop("db_wrote", False) and enabled():
+        seconds = current_app.config["DB_REPLICA_STICKY_SECONDS"]
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{time.time() + seconds:.3f}",
+            max_age=math.ceil(seconds),
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def init_app(app):
+    app.after_request(_mark_sticky)
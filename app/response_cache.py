@@ -0,0 +1,151 @@
+# app/response_cache.py
+# Shared response cache + ETags for the read endpoints.
+#
+# A single integer "cache version" is bumped by every write path after it
+# commits. GET views wrapped in @cached_response store their serialized body
+# under (path + query, version) in a small SQLite file shared by all gunicorn
+# workers on the host, and answer If-None-Match with 304 from that file
+# without touching the ORM. Bumping the version invalidates everything and
+# prunes rows from older versions.
+#
+# Config:
+#   RESPONSE_CACHE_PATH         SQLite file (default: temp dir, one per database URL)
+#   RESPONSE_CACHE_MAX_ENTRIES  max cached bodies, newest kept (default 1000)
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+_local = threading.local()
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO meta (name, value) VALUES ('version', 0)",
+    "INSERT OR IGNORE INTO meta (name, value) VALUES ('bumped_at_ms', 0)",
+    """CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY, version INTEGER NOT NULL, etag TEXT NOT NULL,
+        mimetype TEXT, body BLOB NOT NULL, stored_at REAL NOT NULL
+    )""",
+]
+
+
+def _path():
+    path = current_app.config.get("RESPONSE_CACHE_PATH")
+    if not path:
+        db_id = hashlib.sha1(current_app.config["SQLALCHEMY_DATABASE_URI"].encode()).hexdigest()[:12]
+        path = os.path.join(tempfile.gettempdir(), f"assetshub-cache-{db_id}.sqlite3")
+    return path
+
+
+def _conn():
+    # One connection per thread per process; sqlite3 connections must not
+    # cross a fork or be shared between threads.
+    path = _path()
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid() or _local.path != path:
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        _local.conn, _local.pid, _local.path = conn, os.getpid(), path
+    return conn
+
+
+def current_version():
+    return _conn().execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+
+
+def bump():
+    """Invalidate every cached response. Call after a write commits."""
+    conn = _conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+        conn.execute("UPDATE meta SET value = ? WHERE name = 'bumped_at_ms'",
+                     (int(time.time() * 1000),))
+        conn.execute(
+            "DELETE FROM responses WHERE version < (SELECT value FROM meta WHERE name = 'version')"
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def seconds_since_bump():
+    row = _conn().execute("SELECT value FROM meta WHERE name = 'bumped_at_ms'").fetchone()
+    return time.time() - row[0] / 1000
+
+
+def _lookup(key, version):
+    return _conn().execute(
+        "SELECT etag, mimetype, body FROM responses WHERE key = ? AND version = ?",
+        (key, version),
+    ).fetchone()
+
+
+def _store(key, version, etag, mimetype, body):
+    conn = _conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO responses (key, version, etag, mimetype, body, stored_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        (key, version, etag, mimetype, body, time.time()),
+    )
+    max_entries = current_app.config["RESPONSE_CACHE_MAX_ENTRIES"]
+    conn.execute(
+        "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+        " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+        (max_entries,),
+    )
+
+
+def _finish(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def cached_response(skip_args=()):
+    """
+    Cache a GET view's 200 body and serve it with a strong ETag.
+
+    Requests carrying any of `skip_args` (e.g. presigned URLs that expire,
+    streamed output) bypass the cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if any(a in request.args for a in skip_args):
+                return view(*args, **kwargs)
+
+            key = request.full_path
+            version = current_version()
+            hit = _lookup(key, version)
+            if hit is not None:
+                etag, mimetype, body = hit
+                if request.if_none_match.contains(etag):
+                    return _finish(current_app.response_class(status=304), etag)
+                return _finish(current_app.response_class(body, mimetype=mimetype), etag)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            # A body read from the replica right after a write may predate
+            # it; serve it but don't pin it under the new version
+            if not (g.get("db_replica_read") and seconds_since_bump()
+                    < current_app.config["DB_REPLICA_STICKY_SECONDS"]):
+                _store(key, version, etag, response.mimetype, body)
+            if request.if_none_match.contains(etag):
+                return _finish(current_app.response_class(status=304), etag)
+            return _finish(response, etag)
+        return wrapper
+    return decorator
@@ -0,0 +1,147 @@
+# app/search.py
+# Full-text index over asset name, description and tag names.
+#
+#   SQLite:   FTS5 virtual table  assets_fts(rowid = assets.id)
+#   Postgres: asset_search(asset_id, document tsvector) + GIN index
+#
+# The index lives beside the ORM tables and is kept in sync explicitly by
+# the write paths (asset_routes / tag_routes) inside their own transaction.
+# `flask search rebuild` regenerates it from scratch.
+
+import re
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, event, text
+
+from .models import db, asset_tags
+
+search_commands = AppGroup("search")
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5(name, description, tags)",
+]
+_PG_DDL = [
+    """CREATE TABLE IF NOT EXISTS asset_search (
+        asset_id INTEGER PRIMARY KEY REFERENCES assets(id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_asset_search_document ON asset_search USING GIN (document)",
+]
+
+# Tag names for one asset, as a single space-separated string
+_SQLITE_TAGS = """coalesce((SELECT group_concat(t.name, ' ') FROM asset_tags at
+                  JOIN tags t ON t.id = at.tag_id WHERE at.asset_id = a.id), '')"""
+_PG_TAGS = """coalesce((SELECT string_agg(t.name, ' ') FROM asset_tags at
+              JOIN tags t ON t.id = at.tag_id WHERE at.asset_id = a.id), '')"""
+
+_SQLITE_INSERT = f"""
+    INSERT INTO assets_fts (rowid, name, description, tags)
+    SELECT a.id, a.name, coalesce(a.description, ''), {_SQLITE_TAGS}
+    FROM assets a"""
+_PG_INSERT = f"""
+    INSERT INTO asset_search (asset_id, document)
+    SELECT a.id,
+           setweight(to_tsvector('simple', a.name), 'A') ||
+           setweight(to_tsvector('simple', {_PG_TAGS}), 'B') ||
+           setweight(to_tsvector('simple', coalesce(a.description, '')), 'C')
+    FROM assets a"""
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def create_index_tables(conn):
+    """Create the dialect's index table(s); used by the migration and create_all."""
+    ddl = {"sqlite": _SQLITE_DDL, "postgresql": _PG_DDL}.get(conn.dialect.name, [])
+    for stmt in ddl:
+        conn.execute(text(stmt))
+
+
+def drop_index_tables(conn):
+    name = conn.dialect.name
+    if name == "sqlite":
+        conn.execute(text("DROP TABLE IF EXISTS assets_fts"))
+    elif name == "postgresql":
+        conn.execute(text("DROP TABLE IF EXISTS asset_search"))
+
+
+# Keep db.create_all()/drop_all() (local dev, scripts) in step with migrations
+event.listen(db.metadata, "after_create", lambda target, conn, **kw: create_index_tables(conn))
+event.listen(db.metadata, "before_drop", lambda target, conn, **kw: drop_index_tables(conn))
+
+
+def _ids_param():
+    return bindparam("ids", expanding=True)
+
+
+def unindex_assets(asset_ids):
+    """Remove assets from the index (call before commit on delete)."""
+    asset_ids = list(asset_ids)
+    if not asset_ids:
+        return
+    if _dialect() == "sqlite":
+        stmt = text("DELETE FROM assets_fts WHERE rowid IN :ids")
+    else:
+        stmt = text("DELETE FROM asset_search WHERE asset_id IN :ids")
+    db.session.execute(stmt.bindparams(_ids_param()), {"ids": asset_ids})
+
+
+def index_assets(asset_ids):
+    """(Re)index assets from their current rows; call after flush, before commit."""
+    asset_ids = list(asset_ids)
+    if not asset_ids:
+        return
+    unindex_assets(asset_ids)
+    insert = _SQLITE_INSERT if _dialect() == "sqlite" else _PG_INSERT
+    stmt = text(insert + " WHERE a.id IN :ids").bindparams(_ids_param())
+    db.session.execute(stmt, {"ids": asset_ids})
+
+
+def tagged_asset_ids(tag_id):
+    """Ids of assets carrying a tag (to reindex after a rename/delete)."""
+    q = db.select(asset_tags.c.asset_id).where(asset_tags.c.tag_id == tag_id)
+    return db.session.execute(q).scalars().all()
+
+
+def rebuild():
+    """Drop every index row and regenerate from the assets table."""
+    if _dialect() == "sqlite":
+        db.session.execute(text("DELETE FROM assets_fts"))
+        db.session.execute(text(_SQLITE_INSERT))
+    else:
+        db.session.execute(text("DELETE FROM asset_search"))
+        db.session.execute(text(_PG_INSERT))
+
+
+def search_ids(q, limit, offset=0):
+    """Asset ids matching every word of `q` (prefix match), best first."""
+    words = re.findall(r"\w+", (q or "").lower())
+    if not words:
+        return []
+    params = {"limit": limit, "offset": offset}
+    if _dialect() == "sqlite":
+        params["q"] = " ".join(f'"{w}"*' for w in words)
+        # bm25 column weights: name, description, tags
+        stmt = text("""
+            SELECT rowid FROM assets_fts WHERE assets_fts MATCH :q
+            ORDER BY bm25(assets_fts, 10.0, 1.0, 5.0), rowid DESC
+            LIMIT :limit OFFSET :offset""")
+    else:
+        params["q"] = " & ".join(f"{w}:*" for w in words)
+        stmt = text("""
+            SELECT asset_id FROM asset_search
+            WHERE document @@ to_tsquery('simple', :q)
+            ORDER BY ts_rank(document, to_tsquery('simple', :q)) DESC, asset_id DESC
+            LIMIT :limit OFFSET :offset""")
+    return db.session.execute(stmt, params).scalars().all()
+
+
+# Creates the `flask search rebuild` command
+@search_commands.command("rebuild")
+def rebuild_command():
+    """Regenerate the full-text search index from the assets table."""
+    rebuild()
+    db.session.commit()
+    click.echo("search index rebuilt")
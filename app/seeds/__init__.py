@@ -1,7 +1,10 @@
+import click
 from flask.cli import AppGroup
 from .users import seed_users, undo_users
+from .synthetic import seed_synthetic
 
 from app.models.db import db, environment, SCHEMA
+from app import response_cache
 
 # Creates a seed group to hold our commands
 # So we can type `flask seed --help`
@@ -19,6 +22,7 @@ def seed():
         undo_users()
     seed_users()
     # Add other seed functions here
+    response_cache.bump()
 
 
 # Creates the `flask seed undo` command
@@ -26,3 +30,16 @@ def seed():
 def undo():
     undo_users()
     # Add other undo functions here
+    response_cache.bump()
+
+
+# Creates the `flask seed synthetic` command (large catalogs for benchmarks)
+@seed_commands.command('synthetic')
+@click.option('--assets', 'n_assets', default=10000, show_default=True)
+@click.option('--tags', 'n_tags', default=200, show_default=True)
+@click.option('--tags-per-asset', default=3, show_default=True)
+@click.option('--seed', 'rng_seed', default=1234, show_default=True)
+def synthetic(n_assets, n_tags, tags_per_asset, rng_seed):
+    seed_synthetic(n_assets, n_tags, tags_per_asset=tags_per_asset, seed=rng_seed)
+    response_cache.bump()
+    click.echo(f'seeded {n_assets} assets, {n_tags} tags')
@@ -0,0 +1,57 @@
+import random
+
+from sqlalchemy.sql import text
+
+from app.models import db, Asset, Tag, asset_tags
+from app import changes, search
+
+
+# Generates a large synthetic catalog for benchmarks. Unlike seed_users this
+# never builds ORM objects: every table is filled with executemany INSERTs
+# in batches, so a few hundred thousand rows take seconds, not minutes.
+def seed_synthetic(n_assets, n_tags, tags_per_asset=3, batch=5000, seed=1234):
+    rng = random.Random(seed)
+    words = ["character", "prop", "rigged", "lod0", "lod1", "hero", "env", "vfx",
+             "weapon", "vehicle", "foliage", "modular", "static", "skeletal"]
+
+    tag_start = (db.session.execute(db.select(db.func.max(Tag.id))).scalar() or 0) + 1
+    db.session.execute(
+        db.insert(Tag),
+        [{"id": tag_start + i, "name": f"syn-{words[i % len(words)]}-{i}"} for i in range(n_tags)],
+    )
+    tag_ids = list(range(tag_start, tag_start + n_tags))
+    # Skewed usage like a real catalog: a few tags are on most assets
+    weights = [1.0 / (i + 1) for i in range(n_tags)]
+
+    asset_start = (db.session.execute(db.select(db.func.max(Asset.id))).scalar() or 0) + 1
+    for lo in range(0, n_assets, batch):
+        ids = range(asset_start + lo, asset_start + min(lo + batch, n_assets))
+        db.session.execute(db.insert(Asset), [
+            {
+                "id": i,
+                "name": f"{rng.choice(words)}_{i:07d}",
+                "description": " ".join(rng.choices(words, k=12)),
+                "s3_key": f"synthetic/{i:07d}.fbx",
+                "content_type": "application/octet-stream",
+            }
+            for i in ids
+        ])
+        links = []
+        for i in ids:
+            k = min(tags_per_asset, n_tags)
+            for t in set(rng.choices(tag_ids, weights=weights, k=k)):
+                links.append({"asset_id": i, "tag_id": t})
+        db.session.execute(asset_tags.insert(), links)
+        changes.record(ids)
+        db.session.commit()
+
+    # Ids were given explicitly, so move Postgres sequences past them
+    if db.session.get_bind().dialect.name == "postgresql":
+        for table in ("assets", "tags"):
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'),"
+                f" (SELECT max(id) FROM {table}))"
+            ))
+
+    search.rebuild()
+    db.session.commit()
@@ -0,0 +1,145 @@
+# app/static_files.py
+# WSGI layer that serves the built frontend (react-vite/dist) in front of Flask.
+#
+# Page loads and bundle fetches never reach Flask, so they skip the request
+# hooks, the session and the CSRF cookie. For each file it:
+#   - picks a prebuilt .br or .gz sibling when the client accepts it
+#     (written at build time by react-vite/scripts/precompress.js)
+#   - marks Vite's content-hashed bundles (assets/name-<hash>.js) immutable
+#     for a year; index.html is revalidated on every load
+#   - answers If-None-Match / If-Modified-Since with 304
+#
+# Anything that is not a built file (API calls, unknown paths with an
+# extension) falls through to Flask. Extensionless paths are client-side
+# routes and get index.html, like react_root.
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from werkzeug.http import http_date, is_resource_modified, parse_accept_header
+from werkzeug.utils import get_content_type
+from werkzeug.wsgi import wrap_file
+
+# Vite's default output name: assets/<name>-<8+ char content hash>.<ext>
+_HASHED = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.\w+$")
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _etag(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()[:20]
+
+
+class _File:
+    def __init__(self, root, rel, index):
+        self.path = os.path.join(root, rel)
+        st = os.stat(self.path)
+        self.size = st.st_size
+        self.mtime = datetime.fromtimestamp(int(st.st_mtime), timezone.utc)
+        self.etag = _etag(self.path)
+        mimetype = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        self.content_type = get_content_type(mimetype, "utf-8")
+        if rel == index:
+            self.cache_control = "no-cache"
+        elif _HASHED.match(rel):
+            self.cache_control = _IMMUTABLE
+        else:
+            self.cache_control = "public, max-age=3600"
+        # encoding -> (path, size)
+        self.variants = {}
+        for encoding, suffix in _ENCODINGS:
+            p = self.path + suffix
+            if os.path.isfile(p):
+                self.variants[encoding] = (p, os.path.getsize(p))
+
+
+class StaticFiles:
+    def __init__(self, wsgi_app, root, index="index.html", force_https=False, autorefresh=False):
+        self.app = wsgi_app
+        self.root = os.path.abspath(root)
+        self.index = index
+        self.force_https = force_https
+        self.autorefresh = autorefresh
+        self._files = None
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        files = {}
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith((".br", ".gz")):
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+                files[rel] = _File(self.root, rel, self.index)
+        return files
+
+    def files(self):
+        # Built once per worker (the build only changes on deploy); in debug
+        # it is rescanned per request so a fresh `npm run build` shows up
+        if self._files is None or self.autorefresh:
+            with self._lock:
+                if self._files is None or self.autorefresh:
+                    self._files = self._scan()
+        return self._files
+
+    def lookup(self, path):
+        rel = path.lstrip("/")
+        files = self.files()
+        if rel in files:
+            return files[rel]
+        if rel.startswith("api/") or "." in rel.rsplit("/", 1)[-1]:
+            return None
+        return files.get(self.index)
+
+    def __call__(self, environ, start_response):
+        if environ["REQUEST_METHOD"] not in ("GET", "HEAD"):
+            return self.app(environ, start_response)
+        f = self.lookup(environ.get("PATH_INFO", ""))
+        if f is None:
+            return self.app(environ, start_response)
+        if self.force_https and environ.get("HTTP_X_FORWARDED_PROTO", "https") == "http":
+            # Same rule as https_redirect in app/__init__.py
+            host = environ.get("HTTP_HOST", "")
+            query = environ.get("QUERY_STRING")
+            location = f"https://{host}{environ.get('PATH_INFO', '')}" + (f"?{query}" if query else "")
+            start_response("301 Moved Permanently", [("Location", location)])
+            return [b""]
+        return self._serve(f, environ, start_response)
+
+    def _serve(self, f, environ, start_response):
+        path, size, etag, encoding = f.path, f.size, f.etag, None
+        if f.variants:
+            accept = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING"))
+            for enc, _ in _ENCODINGS:
+                if enc in f.variants and accept[enc] > 0:
+                    encoding = enc
+                    path, size = f.variants[enc]
+                    etag = f"{f.etag}-{enc}"
+                    break
+
+        headers = [
+            ("ETag", f'"{etag}"'),
+            ("Last-Modified", http_date(f.mtime)),
+            ("Cache-Control", f.cache_control),
+        ]
+        if f.variants:
+            headers.append(("Vary", "Accept-Encoding"))
+        if not is_resource_modified(environ, etag=etag, last_modified=f.mtime):
+            start_response("304 Not Modified", headers)
+            return [b""]
+
+        headers += [("Content-Type", f.content_type), ("Content-Length", str(size))]
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
+        start_response("200 OK", headers)
+        if environ["REQUEST_METHOD"] == "HEAD":
+            return [b""]
+        return wrap_file(environ, open(path, "rb"))
@@ -0,0 +1,294 @@
+# app/tag_index.py
+# Per-worker inverted index: tag -> sorted asset ids.
+#
+# Each tag's posting list is an array('I') of asset ids in ascending order,
+# 4 bytes per tagged asset whatever the largest id, so a tag on one asset
+# costs a few bytes. AND/OR across tags are set intersections/unions run in
+# C, and paging is a bisect into the sorted result. A forward map (asset ->
+# tag ids) makes facet counts proportional to the matching assets, not to
+# the number of tags.
+#
+# The index is built on first use in each worker process and updated in
+# place by the write paths after they commit. Every TAG_INDEX_TTL seconds it
+# is rebuilt from asset_tags on a background thread and swapped in under
+# the lock, so changes made by other workers converge without a request
+# ever waiting for a rebuild (only the very first build in a worker does).
+#
+# It also keeps the tag names in sorted order (lowercased), so prefix
+# autocomplete is a bisect plus a top-N pick by posting-list length.
+
+import heapq
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain, repeat
+
+from flask import current_app
+
+from .models import db, Tag, asset_tags
+
+
+class TagIndex:
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._posting = {}   # tag_id -> array('I') of asset ids, ascending
+        self._tags_of = {}   # asset_id -> tuple of tag ids
+        self._ids = {}       # tag name -> tag_id
+        self._names = {}     # tag_id -> tag name
+        self._sorted = []    # [(lowercased name, tag_id)], sorted
+        self._built_at = None
+        self._pid = None
+        self._refreshing = False
+
+    # ---- build -------------------------------------------------------------
+
+    def _stale(self):
+        return (self._built_at is None or self._pid != os.getpid()
+                or time.monotonic() - self._built_at > self.ttl)
+
+    def _ready(self):
+        return self._built_at is not None and self._pid == os.getpid()
+
+    def rebuild(self):
+        names = dict(db.session.execute(db.select(Tag.id, Tag.name)).all())
+        posting = {tag_id: array("I") for tag_id in names}
+        tags_of = {}
+        # (tag_id, asset_id) order is ix_asset_tags_tag_id's, so each
+        # posting list comes out sorted
+        q = (db.select(asset_tags.c.tag_id, asset_tags.c.asset_id)
+             .order_by(asset_tags.c.tag_id, asset_tags.c.asset_id))
+        for tag_id, asset_id in db.session.execute(q).yield_per(10000):
+            ids = posting.get(tag_id)
+            if ids is None:
+                ids = posting[tag_id] = array("I")
+            ids.append(asset_id)
+            tags_of.setdefault(asset_id, []).append(tag_id)
+        tags_of = {asset_id: tuple(t) for asset_id, t in tags_of.items()}
+        ordered = sorted((n.lower(), i) for i, n in names.items())
+        with self._lock:
+            self._posting = posting
+            self._tags_of = tags_of
+            self._names = names
+            self._ids = {n: i for i, n in names.items()}
+            self._sorted = ordered
+            self._built_at = time.monotonic()
+            self._pid = os.getpid()
+
+    def _ensure(self):
+        if not self._ready():
+            self.rebuild()
+        elif self._stale():
+            self.refresh_async(current_app._get_current_object())
+
+    def invalidate(self):
+        """Mark stale; the next query starts a background rebuild."""
+        with self._lock:
+            if self._built_at is not None:
+                self._built_at = float("-inf")
+
+    def refresh_async(self, app):
+        """Rebuild on a background thread (one at a time) if stale."""
+        if not self._stale() or self._refreshing:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with app.app_context():
+                    self.rebuild()
+            except Exception:
+                app.logger.exception("Tag index rebuild failed")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="tag-index", daemon=True).start()
+
+    # ---- incremental updates (call after commit) ---------------------------
+    # All of these run with the lock held; readers copy what they need
+    # under the same lock.
+
+    def _set_name(self, tag_id, name):
+        # Caller holds the lock
+        old = self._names.get(tag_id)
+        if old == name:
+            return
+        if old is not None:
+            if self._ids.get(old) == tag_id:
+                del self._ids[old]
+            self._drop_sorted(old, tag_id)
+        self._names[tag_id] = name
+        self._ids[name] = tag_id
+        insort(self._sorted, (name.lower(), tag_id))
+
+    def _drop_sorted(self, name, tag_id):
+        entry = (name.lower(), tag_id)
+        i = bisect_left(self._sorted, entry)
+        if i < len(self._sorted) and self._sorted[i] == entry:
+            del self._sorted[i]
+
+    def _link(self, asset_id, tag_id):
+        ids = self._posting.setdefault(tag_id, array("I"))
+        i = bisect_left(ids, asset_id)
+        if i == len(ids) or ids[i] != asset_id:
+            ids.insert(i, asset_id)
+            self._tags_of[asset_id] = self._tags_of.get(asset_id, ()) + (tag_id,)
+
+    def _unlink(self, asset_id, tag_id):
+        ids = self._posting.get(tag_id)
+        if ids is not None:
+            i = bisect_left(ids, asset_id)
+            if i < len(ids) and ids[i] == asset_id:
+                del ids[i]
+        tags = tuple(t for t in self._tags_of.get(asset_id, ()) if t != tag_id)
+        if tags:
+            self._tags_of[asset_id] = tags
+        else:
+            self._tags_of.pop(asset_id, None)
+
+    def _link_many(self, tag_id, asset_ids):
+        have = self._posting.get(tag_id, ())
+        seen = set(have)
+        new = [a for a in asset_ids if a not in seen]
+        if new:
+            self._posting[tag_id] = array("I", sorted(seen.union(new)))
+            for asset_id in new:
+                self._tags_of[asset_id] = self._tags_of.get(asset_id, ()) + (tag_id,)
+
+    def _unlink_many(self, tag_id, asset_ids):
+        drop = set(asset_ids)
+        have = self._posting.get(tag_id)
+        if have is None:
+            return
+        self._posting[tag_id] = array("I", (a for a in have if a not in drop))
+        for asset_id in drop.intersection(have):
+            self._unlink(asset_id, tag_id)
+
+    def add_asset(self, asset_id, tags):
+        """tags: iterable of (tag_id, name)."""
+        if self._built_at is None:
+            return
+        with self._lock:
+            for tag_id, name in tags:
+                self._set_name(tag_id, name)
+                self._link(asset_id, tag_id)
+
+    def remove_asset(self, asset_id, tag_ids):
+        if self._built_at is None:
+            return
+        with self._lock:
+            for tag_id in tag_ids:
+                self._unlink(asset_id, tag_id)
+
+    def put_tag(self, tag_id, name):
+        """New tag or rename."""
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._set_name(tag_id, name)
+            self._posting.setdefault(tag_id, array("I"))
+
+    def remove_tag(self, tag_id):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove_tag(tag_id)
+
+    def _remove_tag(self, tag_id):
+        # Caller holds the lock; returns the tag's posting list
+        name = self._names.pop(tag_id, None)
+        if name is not None:
+            if self._ids.get(name) == tag_id:
+                del self._ids[name]
+            self._drop_sorted(name, tag_id)
+        ids = self._posting.pop(tag_id, array("I"))
+        for asset_id in ids:
+            tags = tuple(t for t in self._tags_of.get(asset_id, ()) if t != tag_id)
+            if tags:
+                self._tags_of[asset_id] = tags
+            else:
+                self._tags_of.pop(asset_id, None)
+        return ids
+
+    def merge_tags(self, target_id, target_name, source_ids):
+        """Fold the source tags' assets into the target and drop the sources."""
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._set_name(target_id, target_name)
+            moved = set()
+            for tag_id in source_ids:
+                moved.update(self._remove_tag(tag_id))
+            self._link_many(target_id, moved)
+
+    def retag(self, asset_ids, add=(), remove=()):
+        """add: iterable of (tag_id, name); remove: tag ids. Applies to every asset in asset_ids."""
+        if self._built_at is None:
+            return
+        asset_ids = set(asset_ids)
+        with self._lock:
+            for tag_id, name in add:
+                self._set_name(tag_id, name)
+                self._link_many(tag_id, asset_ids)
+            for tag_id in remove:
+                self._unlink_many(tag_id, asset_ids)
+
+    # ---- queries -----------------------------------------------------------
+
+    def match(self, names, mode="all"):
+        """Sorted array('I') of the assets carrying all (or any) of the named tags."""
+        self._ensure()
+        with self._lock:
+            found = [self._posting[self._ids[n]] for n in names if n in self._ids]
+            if mode == "any":
+                ids = set().union(*found)
+            elif not found or len(found) < len(names):
+                ids = ()
+            else:
+                found.sort(key=len)
+                ids = set(found[0]).intersection(*found[1:])
+        return array("I", sorted(ids))
+
+    def facets(self, ids, exclude=()):
+        """{tag name: count of assets in `ids` carrying it}, zero counts dropped."""
+        self._ensure()
+        with self._lock:
+            counts = Counter(chain.from_iterable(map(self._tags_of.get, ids, repeat(()))))
+            names = self._names
+            return {names[t]: n for t, n in counts.items()
+                    if t in names and names[t] not in exclude}
+
+    def suggest(self, prefix, limit):
+        """
+        Up to `limit` (tag_id, name, count) whose name starts with `prefix`
+        (case-insensitive), most used first. None until the index has been
+        built in this worker; a stale index still answers.
+        """
+        if not self._ready():
+            return None
+        key = prefix.lower()
+        with self._lock:
+            lo = bisect_left(self._sorted, (key,))
+            # Every name starting with key sorts below key + the last code point
+            hi = bisect_left(self._sorted, (key + "\U0010ffff",), lo)
+            posting = self._posting
+            top = heapq.nlargest(limit, self._sorted[lo:hi],
+                                 key=lambda e: len(posting.get(e[1], ())))
+            return [(tag_id, self._names[tag_id], len(posting.get(tag_id, ())))
+                    for _, tag_id in top]
+
+
+def page_ids(ids, limit, after=None):
+    """Highest `limit` asset ids in sorted `ids` below `after`, newest first."""
+    hi = len(ids) if after is None else bisect_left(ids, after)
+    lo = max(0, hi - limit)
+    return ids[lo:hi].tolist()[::-1], lo > 0
+
+
+tag_index = TagIndex(ttl=int(os.environ.get("TAG_INDEX_TTL", 60)))
@@ -0,0 +1,91 @@
+# app/user_cache.py
+# Per-worker cache for flask-login's user loader.
+#
+# Every authenticated request used to cost a users-table lookup. Cached
+# entries are plain column snapshots (never live ORM objects, which belong
+# to one request's session); a hit is rebuilt into a User attached to the
+# current session without a query. Writes to a User through the ORM drop
+# its entry in this worker; other workers pick the change up within
+# USER_CACHE_TTL seconds.
+#
+# Config:
+#   USER_CACHE_SIZE  max cached users per worker (default 1024; 0 disables)
+#   USER_CACHE_TTL   seconds an entry is trusted (default 60)
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from .models import db, User
+
+_COLUMNS = [c.key for c in User.__table__.columns]
+
+
+class UserCache:
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()   # user id -> (snapshot, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._items.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, user):
+        if self.maxsize <= 0:
+            return
+        snapshot = {c: getattr(user, c) for c in _COLUMNS}
+        with self._lock:
+            self._items[user.id] = (snapshot, time.monotonic() + self.ttl)
+            self._items.move_to_end(user.id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def load(self, user_id):
+        """The User for `user_id` in the current session, or None."""
+        snapshot = self.get(user_id)
+        if snapshot is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self.put(user)
+            return user
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        # load=False: trust the snapshot, no SELECT; returns the session's
+        # own instance if this user was already loaded in the request
+        return db.session.merge(user, load=False)
+
+
+user_cache = UserCache(
+    maxsize=int(os.environ.get("USER_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("USER_CACHE_TTL", 60)),
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _drop_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
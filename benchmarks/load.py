@@ -0,0 +1,235 @@
+"""
+Concurrent-request capacity of the gunicorn worker classes.
+
+    python benchmarks/load.py                          # sync vs gthread (vs gevent if installed)
+    python benchmarks/load.py --clients 128 --s3-latency 0.2
+    python benchmarks/load.py --modes gthread --threads 16
+
+Starts a stand-in S3 endpoint that answers every call after --s3-latency
+seconds, then boots gunicorn with gunicorn.conf.py once per worker class on
+the benchmark catalog (see run.py). --clients keep-alive clients poll
+GET /api/uploads/multipart/parts (one S3 round trip per request) and, for
+one request in five, GET /api/jobs/stats (database only) for --duration
+seconds. Reports throughput, latency percentiles, errors and the most
+requests the fake S3 saw at once: how many slow requests one instance
+really keeps in flight.
+
+Needs the app requirements; gevent mode needs `gevent` installed.
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from run import ROOT, _env, _percentile, build_dataset
+
+_LIST_PARTS = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<ListPartsResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+    b"<Bucket>assetshub-bench</Bucket><Key>load.fbx</Key><UploadId>load</UploadId>"
+    b"<IsTruncated>false</IsTruncated><Part><PartNumber>1</PartNumber>"
+    b"<ETag>&quot;0123456789abcdef&quot;</ETag><Size>5242880</Size>"
+    b"<LastModified>2026-01-01T00:00:00.000Z</LastModified></Part></ListPartsResult>"
+)
+
+
+# ---------- fake S3 -----------------------------------------------------------
+
+class FakeS3(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), _S3Handler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def reset_peak(self):
+        with self.lock:
+            self.peak = self.in_flight
+
+
+class _S3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        s = self.server
+        with s.lock:
+            s.in_flight += 1
+            s.peak = max(s.peak, s.in_flight)
+        try:
+            time.sleep(s.latency)
+        finally:
+            with s.lock:
+                s.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(_LIST_PARTS)))
+        self.end_headers()
+        self.wfile.write(_LIST_PARTS)
+
+    def log_message(self, *args):
+        pass
+
+
+# ---------- gunicorn ----------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_gunicorn(mode, args, db_path, workdir, s3_url):
+    port = _free_port()
+    env = _env(db_path, workdir)
+    env.update({
+        "PORT": str(port),
+        "WEB_CONCURRENCY": str(args.workers),
+        "GUNICORN_WORKER_CLASS": mode,
+        "GUNICORN_THREADS": str(args.threads),
+        "GUNICORN_WORKER_CONNECTIONS": str(args.connections),
+        "S3_ENDPOINT_URL": s3_url,
+        "S3_ADDRESSING_STYLE": "path",
+        "METRICS_MODE": "off",
+    })
+    log = open(os.path.join(workdir, f"gunicorn-{mode}.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "app:app"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn ({mode}) exited; see {log.name}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/api/jobs/stats")
+            if conn.getresponse().status == 200:
+                return proc, port
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"gunicorn ({mode}) did not come up; see {log.name}")
+
+
+# ---------- load --------------------------------------------------------------
+
+PATHS = {
+    "parts": "/api/uploads/multipart/parts?key=load.fbx&upload_id=load",
+    "stats": "/api/jobs/stats",
+}
+
+
+def _client(port, deadline, results, lock, seed):
+    latencies = {name: [] for name in PATHS}
+    errors = 0
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    i = seed
+    while time.monotonic() < deadline:
+        name = "stats" if i % 5 == 0 else "parts"
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", PATHS[name])
+            resp = conn.getresponse()
+            resp.read()
+            ok = resp.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            ok = False
+        if ok:
+            latencies[name].append(time.perf_counter() - t0)
+        else:
+            errors += 1
+    conn.close()
+    with lock:
+        for name, values in latencies.items():
+            results[name].extend(values)
+        results["errors"] += errors
+
+
+def run_mode(mode, args, db_path, s3):
+    workdir = tempfile.mkdtemp(prefix=f"load-{mode}-")
+    proc, port = _start_gunicorn(mode, args, db_path, workdir,
+                                 f"http://127.0.0.1:{s3.server_address[1]}")
+    try:
+        s3.reset_peak()
+        results = {"parts": [], "stats": [], "errors": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + args.duration
+        clients = [threading.Thread(target=_client, args=(port, deadline, results, lock, n))
+                   for n in range(args.clients)]
+        t0 = time.perf_counter()
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        elapsed = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait(30)
+
+    parts = sorted(results["parts"])
+    stats = sorted(results["stats"])
+    return {
+        "mode": mode,
+        "rps": (len(parts) + len(stats)) / elapsed,
+        "parts_p50_ms": _percentile(parts, 50) * 1000,
+        "parts_p95_ms": _percentile(parts, 95) * 1000,
+        "stats_p95_ms": _percentile(stats, 95) * 1000,
+        "errors": results["errors"],
+        "s3_peak": s3.peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", default="sync,gthread,gevent",
+                        help="comma-separated worker classes (gevent skipped if not installed)")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--s3-latency", type=float, default=0.1, help="seconds per S3 call")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--assets", type=int, default=20000)
+    parser.add_argument("--tags", type=int, default=300)
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    if "gevent" in modes:
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print("gevent not installed; skipping gevent mode")
+            modes.remove("gevent")
+
+    db_path = build_dataset(args.assets, args.tags)
+    s3 = FakeS3(args.s3_latency)
+    threading.Thread(target=s3.serve_forever, daemon=True).start()
+    try:
+        results = [run_mode(m, args, db_path, s3) for m in modes]
+    finally:
+        s3.shutdown()
+
+    print(f"\n{args.clients} clients, {args.workers} workers, S3 latency "
+          f"{args.s3_latency * 1000:.0f} ms, {args.duration:.0f}s per mode")
+    print(f"{'mode':<10}{'req/s':>9}{'parts p50':>11}{'parts p95':>11}{'stats p95':>11}"
+          f"{'errors':>8}{'S3 in flight':>14}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['rps']:>9.1f}{r['parts_p50_ms']:>11.1f}{r['parts_p95_ms']:>11.1f}"
+              f"{r['stats_p95_ms']:>11.1f}{r['errors']:>8}{r['s3_peak']:>14}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
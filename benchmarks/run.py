@@ -0,0 +1,374 @@
+"""
+Offline benchmark suite for the AssetsHub API.
+
+    python benchmarks/run.py                       # run all scenarios
+    python benchmarks/run.py -k list_assets        # only matching scenarios
+    python benchmarks/run.py --save-baseline       # write benchmarks/baseline.json
+    python benchmarks/run.py --fail-on-regression  # exit 1 if slower than baseline
+
+A synthetic catalog is generated once per (--assets, --tags) with
+`flask seed synthetic` into a cached SQLite file. Every scenario then runs
+in its own subprocess through the Flask test client, with S3 replaced by
+moto, and reports p50/p95/p99 latency, throughput and that process's peak
+RSS. Results are compared with the stored baseline and any scenario whose
+p50 or p95 grew by more than --tolerance is flagged.
+
+Needs the app requirements plus `moto` (see benchmarks/requirements.txt).
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "assetshub-bench")
+
+
+# ---------- environment -------------------------------------------------------
+
+def _env(db_path, workdir):
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "RESPONSE_CACHE_PATH": os.path.join(workdir, "response-cache.sqlite3"),
+        "METRICS_PATH": os.path.join(workdir, "metrics.sqlite3"),
+        "AWS_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "S3_BUCKET": "assetshub-bench",
+        "FLASK_APP": "app",
+        "PYTHONPATH": ROOT,
+    })
+    env.pop("RENDER", None)
+    env.pop("FLASK_ENV", None)
+    return env
+
+
+def _load_app():
+    """Import the app inside a scenario process with SQL echo silenced."""
+    import logging
+
+    from app import app, db
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    with app.app_context():
+        db.engine.echo = False
+    return app, db
+
+
+def build_dataset(n_assets, n_tags):
+    """Seed (or reuse) a SQLite catalog; returns its path."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # A new migration invalidates the cached catalog
+    schema = hashlib.sha1(
+        "".join(sorted(os.listdir(os.path.join(ROOT, "migrations", "versions")))).encode()
+    ).hexdigest()[:8]
+    path = os.path.join(CACHE_DIR, f"catalog-{n_assets}-{n_tags}-{schema}.db")
+    if os.path.exists(path):
+        return path
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    env = _env(tmp, CACHE_DIR)
+    quiet = {"cwd": ROOT, "env": env, "stdout": subprocess.DEVNULL, "check": True}
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "flask", "db", "upgrade"], **quiet)
+    subprocess.run([sys.executable, "-m", "flask", "seed", "synthetic",
+                    "--assets", str(n_assets), "--tags", str(n_tags)], **quiet)
+    os.replace(tmp, path)
+    print(f"seeded {n_assets} assets / {n_tags} tags in {time.perf_counter() - t0:.1f}s")
+    return path
+
+
+# ---------- scenarios ---------------------------------------------------------
+# Each scenario is (setup(client) -> state, call(client, state, i) -> response)
+
+def _tag_names(client):
+    tags = client.get("/api/tags").get_json()
+    tags.sort(key=lambda t: -len(t["assets"]))
+    return [t["name"] for t in tags]
+
+
+def _setup_none(client):
+    return None
+
+
+def _setup_etag(client):
+    return client.get("/api/assets?limit=100").headers["ETag"]
+
+
+def _setup_tags(client):
+    return _tag_names(client)[:2]
+
+
+def _setup_presign(client):
+    assets = client.get("/api/assets?limit=60").get_json()["assets"]
+    return [a["s3_key"] for a in assets]
+
+
+def _setup_changes(client):
+    """A change feed cursor 100 changes behind the head."""
+    cursor = 0
+    while True:
+        page = client.get("/api/assets/changes?fields=id&limit=1000&since=%d" % cursor).get_json()
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return max(0, cursor - 100)
+
+
+def _setup_user(client):
+    """Sign up a bench user; the client is left logged in."""
+    client.get("/api/auth/")                    # sets the csrf_token cookie
+    creds = {"username": "bench-user", "email": "bench@example.com", "password": "password"}
+    resp = client.post("/api/auth/signup", json=creds)
+    if resp.status_code != 200:
+        raise SystemExit(f"signup failed: {resp.get_data()[:200]!r}")
+    return creds
+
+
+def _setup_bundle(client):
+    """Path of the built JS bundle referenced by index.html."""
+    import re
+
+    html = client.get("/").get_data(as_text=True)
+    return re.search(r'src="(/assets/[^"]+\.js)"', html).group(1)
+
+
+def _setup_bundle_etag(client):
+    path = _setup_bundle(client)
+    return path, client.get(path).headers["ETag"]
+
+
+# What a grid view needs (?fields= sparse fieldset)
+FIELDS = "id,name,url,tags"
+
+SCENARIOS = {
+    "list_assets_page": (
+        _setup_none, lambda c, s, i: c.get("/api/assets?limit=100&bench=%d" % i)),
+    "list_assets_cached": (
+        _setup_none, lambda c, s, i: c.get("/api/assets?limit=100")),
+    "list_assets_304": (
+        _setup_etag, lambda c, s, i: c.get("/api/assets?limit=100", headers={"If-None-Match": s})),
+    "list_assets_ndjson": (
+        _setup_none, lambda c, s, i: c.get("/api/assets?format=ndjson")),
+    "list_assets_fields": (
+        _setup_none, lambda c, s, i: c.get("/api/assets?limit=100&fields=%s&bench=%d" % (FIELDS, i))),
+    "list_assets_ndjson_fields": (
+        _setup_none, lambda c, s, i: c.get("/api/assets?format=ndjson&fields=" + FIELDS)),
+    "list_assets_by_tags": (
+        _setup_tags, lambda c, s, i: c.get("/api/assets?tags=%s&bench=%d" % (",".join(s), i))),
+    "search_assets": (
+        _setup_none, lambda c, s, i: c.get("/api/assets/search?q=char&limit=50")),
+    "asset_changes_delta": (
+        _setup_changes, lambda c, s, i: c.get("/api/assets/changes?since=%d&bench=%d" % (s, i))),
+    "list_tags": (
+        _setup_none, lambda c, s, i: c.get("/api/tags?bench=%d" % i)),
+    "list_tags_fields": (
+        _setup_none, lambda c, s, i: c.get("/api/tags?fields=id,name&bench=%d" % i)),
+    "create_asset": (
+        _setup_none, lambda c, s, i: c.post("/api/assets", json={
+            "name": f"bench-{i}", "description": "benchmark asset",
+            "tags": ["bench", f"bench-{i % 10}", "character"]})),
+    "bulk_create_100": (
+        _setup_none, lambda c, s, i: c.post("/api/assets/bulk", json=[
+            {"name": f"bulk-{i}-{j}", "tags": ["bench", f"bench-{j % 10}"]} for j in range(100)])),
+    "tag_crud": (
+        _setup_none, lambda c, s, i: _tag_crud(c, i)),
+    "presign_get": (
+        _setup_presign, lambda c, s, i: c.get("/api/uploads/get-url?key=" + s[i % len(s)])),
+    "presign_batch_60": (
+        _setup_presign, lambda c, s, i: c.post("/api/uploads/get-urls", json={"keys": s})),
+    "auth_session": (
+        _setup_user, lambda c, s, i: c.get("/api/auth/")),
+    "auth_login": (
+        _setup_user, lambda c, s, i: c.post("/api/auth/login", json={
+            "email": s["email"], "password": s["password"]})),
+    "static_index": (
+        _setup_none, lambda c, s, i: c.get("/")),
+    "static_bundle_br": (
+        _setup_bundle, lambda c, s, i: c.get(s, headers={"Accept-Encoding": "gzip, br"})),
+    "static_bundle_304": (
+        _setup_bundle_etag, lambda c, s, i: c.get(s[0], headers={"If-None-Match": s[1]})),
+    "presign_put": (
+        _setup_none, lambda c, s, i: c.get("/api/uploads/s3-url?filename=bench-%d.fbx" % i)),
+}
+
+# Scenarios that write run on a private copy of the catalog
+WRITES = {"create_asset", "bulk_create_100", "tag_crud", "auth_session", "auth_login"}
+# Whole-catalog scenarios run iterations // n times
+HEAVY = {"list_assets_ndjson": 20, "list_assets_ndjson_fields": 20, "bulk_create_100": 4}
+
+
+def _tag_crud(client, i):
+    t = client.post("/api/tags", json={"name": f"crud-{i}"}).get_json()
+    client.put(f"/api/tags/{t['id']}", json={"name": f"crud-{i}-renamed"})
+    return client.delete(f"/api/tags/{t['id']}")
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_scenario(name, iterations, warmup):
+    """Runs inside the scenario subprocess; prints one JSON result line."""
+    from moto import mock_aws
+
+    with mock_aws():
+        import boto3
+
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="assetshub-bench")
+        app, _ = _load_app()
+        client = app.test_client()
+        setup, call = SCENARIOS[name]
+        state = setup(client)
+
+        for i in range(warmup):
+            call(client, state, -1 - i).get_data()
+
+        latencies = []
+        t_start = time.perf_counter()
+        cpu_start = time.process_time()
+        for i in range(iterations):
+            t0 = time.perf_counter()
+            resp = call(client, state, i)
+            resp.get_data()
+            latencies.append(time.perf_counter() - t0)
+            if resp.status_code >= 400:
+                raise SystemExit(f"{name}: HTTP {resp.status_code}: {resp.get_data()[:200]!r}")
+        elapsed = time.perf_counter() - t_start
+        cpu = time.process_time() - cpu_start
+
+    latencies.sort()
+    print(json.dumps({
+        "scenario": name,
+        "iterations": iterations,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "throughput_rps": iterations / elapsed if elapsed else 0.0,
+        # CPU time of this process (app + test client) per request
+        "cpu_ms": cpu / iterations * 1000,
+        "peak_rss_mb": _peak_rss_mb(),
+    }))
+
+
+# ---------- driver ------------------------------------------------------------
+
+def _spawn(name, db_path, args):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        if name in WRITES:
+            copy = os.path.join(workdir, "catalog.db")
+            shutil.copyfile(db_path, copy)
+            db_path = copy
+        iterations = max(5, args.iterations // HEAVY.get(name, 1))
+        warmup = min(args.warmup, iterations)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--scenario", name,
+             "--iterations", str(iterations), "--warmup", str(warmup)],
+            cwd=ROOT, env=_env(db_path, workdir), capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"scenario {name} failed:\n{proc.stderr[-2000:]}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _compare(results, baseline, tolerance):
+    regressions = []
+    for r in results:
+        base = baseline.get(r["scenario"])
+        if not base:
+            r["vs_baseline"] = "new"
+            continue
+        worst = max(r["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0,
+                    r["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0)
+        r["vs_baseline"] = f"{worst:.2f}x"
+        if worst > 1.0 + tolerance:
+            regressions.append(r["scenario"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, default=20000)
+    parser.add_argument("--tags", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("-k", dest="match", default="", help="only scenarios containing this")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", dest="json_out", help="also write results to this file")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        run_scenario(args.scenario, args.iterations, args.warmup)
+        return 0
+
+    db_path = build_dataset(args.assets, args.tags)
+    names = [n for n in SCENARIOS if args.match in n]
+    results = [_spawn(n, db_path, args) for n in names]
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f).get("scenarios", {})
+    regressions = _compare(results, baseline, args.tolerance)
+
+    print(f"\n{'scenario':<27}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'req/s':>10}{'CPU ms':>9}{'RSS MB':>9}  vs baseline")
+    for r in results:
+        flag = "  REGRESSION" if r["scenario"] in regressions else ""
+        print(f"{r['scenario']:<27}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['throughput_rps']:>10.1f}{r['cpu_ms']:>9.2f}{r['peak_rss_mb']:>9.1f}"
+              f"  {r.get('vs_baseline', '-')}{flag}")
+
+    report = {
+        "dataset": {"assets": args.assets, "tags": args.tags},
+        "iterations": args.iterations,
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": {r["scenario"]: {k: v for k, v in r.items() if k not in ("scenario", "vs_baseline")}
+                      for r in results},
+    }
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        if baseline:
+            # Keep entries for scenarios that were filtered out with -k
+            report["scenarios"] = {**baseline, **report["scenarios"]}
+        with open(BASELINE, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {os.path.relpath(BASELINE, ROOT)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
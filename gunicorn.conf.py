@@ -0,0 +1,56 @@
+# gunicorn.conf.py
+# Read by gunicorn from the working directory (render-start.sh, Dockerfile).
+#
+# Sync workers serve one request at a time, so a handful of slow clients
+# or slow S3 round trips (multipart part listing, upload polling) was enough
+# to stall an instance. The default is gthread: each worker process runs
+# GUNICORN_THREADS requests at once, and the DB and S3 connection pools are
+# sized to match. gevent is supported too; it needs `pip install gevent
+# psycogreen` (not in requirements.txt) so Postgres queries yield instead of
+# blocking the worker.
+#
+# Env:
+#   WEB_CONCURRENCY              worker processes (default 2)
+#   GUNICORN_WORKER_CLASS        "gthread" (default), "gevent" or "sync"
+#   GUNICORN_THREADS             requests in flight per gthread worker (default 8)
+#   GUNICORN_WORKER_CONNECTIONS  requests in flight per gevent worker (default 100)
+#   GUNICORN_TIMEOUT             seconds before a stuck worker is restarted (default 60)
+#
+# benchmarks/load.py compares the worker classes under slow-upstream polling.
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+# gunicorn silently swaps sync for gthread when threads > 1
+threads = int(os.environ.get("GUNICORN_THREADS", 8)) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+keepalive = 5
+
+if worker_class == "gthread":
+    in_flight = threads
+elif worker_class == "gevent":
+    in_flight = worker_connections
+else:
+    in_flight = 1
+
+# Workers inherit these before the app (app/config.py, app/api/s3.py) reads
+# them. Under gevent the DB pool keeps its default size: requests that need
+# the database queue for a connection rather than opening one per greenlet.
+if worker_class == "gthread":
+    os.environ.setdefault("DB_POOL_SIZE", str(threads))
+    os.environ.setdefault("DB_REPLICA_POOL_SIZE", str(max(threads, 10)))
+os.environ.setdefault("S3_MAX_POOL_CONNECTIONS", str(max(in_flight, 10)))
+
+
+def post_fork(server, worker):
+    if worker_class != "gevent":
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning("psycogreen is not installed; Postgres queries will block gevent workers")
+    else:
+        patch_psycopg()
@@ -38,6 +38,21 @@ target_metadata = current_app.extensions['migrate'].db.metadata
 # ... etc.
 
 
+# Full-text search tables and the byte-order s3_key index are created by
+# hand in migrations (see app/search.py); keep autogenerate from proposing
+# to drop them.
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None:
+        return not (name.startswith("assets_fts") or name == "asset_search")
+    if type_ == "index" and reflected and compare_to is None:
+        return name != "ix_assets_s3_key_c"
+    # SQLAlchemy cannot reflect expression indexes, so autogenerate would
+    # propose re-adding the lower(name) one on every run
+    if type_ == "index" and not reflected and name == "ix_assets_name_lower":
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -52,7 +67,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=target_metadata, literal_binds=True
+        url=url, target_metadata=target_metadata, literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -88,6 +104,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions['migrate'].configure_args
         )
         # Create a schema (only in production)
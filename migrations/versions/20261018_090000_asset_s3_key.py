@@ -0,0 +1,30 @@
+"""asset s3_key + content_type columns
+
+Revision ID: 83015194545a
+Revises: f2d1005c7d1c
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '83015194545a'
+down_revision = 'f2d1005c7d1c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('s3_key', sa.String(length=1024), nullable=True))
+        batch_op.add_column(sa.Column('content_type', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_assets_s3_key', ['s3_key'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        batch_op.drop_index('ix_assets_s3_key')
+        batch_op.drop_column('content_type')
+        batch_op.drop_column('s3_key')
@@ -0,0 +1,55 @@
+"""full-text search index for assets
+
+Revision ID: d2f802291032
+Revises: 83015194545a
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f802291032'
+down_revision = '83015194545a'
+branch_labels = None
+depends_on = None
+
+# SQLite: FTS5 virtual table keyed by assets.id (rowid)
+# Postgres: tsvector document per asset with a GIN index
+SQLITE_UP = [
+    "CREATE VIRTUAL TABLE assets_fts USING fts5(name, description, tags)",
+    """INSERT INTO assets_fts (rowid, name, description, tags)
+       SELECT a.id, a.name, coalesce(a.description, ''),
+              coalesce((SELECT group_concat(t.name, ' ') FROM asset_tags at
+                        JOIN tags t ON t.id = at.tag_id WHERE at.asset_id = a.id), '')
+       FROM assets a""",
+]
+PG_UP = [
+    """CREATE TABLE asset_search (
+        asset_id INTEGER PRIMARY KEY REFERENCES assets(id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX ix_asset_search_document ON asset_search USING GIN (document)",
+    """INSERT INTO asset_search (asset_id, document)
+       SELECT a.id,
+              setweight(to_tsvector('simple', a.name), 'A') ||
+              setweight(to_tsvector('simple', coalesce((SELECT string_agg(t.name, ' ')
+                        FROM asset_tags at JOIN tags t ON t.id = at.tag_id
+                        WHERE at.asset_id = a.id), '')), 'B') ||
+              setweight(to_tsvector('simple', coalesce(a.description, '')), 'C')
+       FROM assets a""",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for stmt in SQLITE_UP if dialect == "sqlite" else PG_UP:
+        op.execute(stmt)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE assets_fts")
+    else:
+        op.execute("DROP TABLE asset_search")
@@ -0,0 +1,28 @@
+"""asset content_sha256 for duplicate detection
+
+Revision ID: a80de70ee2d3
+Revises: d2f802291032
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a80de70ee2d3'
+down_revision = 'd2f802291032'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_assets_content_sha256', ['content_sha256'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        batch_op.drop_index('ix_assets_content_sha256')
+        batch_op.drop_column('content_sha256')
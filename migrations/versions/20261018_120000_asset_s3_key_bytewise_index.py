@@ -0,0 +1,30 @@
+"""byte-order index on assets.s3_key for bucket reconciliation
+
+Revision ID: 102632135744
+Revises: a80de70ee2d3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '102632135744'
+down_revision = 'a80de70ee2d3'
+branch_labels = None
+depends_on = None
+
+# `flask assets reconcile` walks s3_key in the same byte order S3 lists keys.
+# SQLite's default BINARY collation already matches ix_assets_s3_key;
+# Postgres sorts by locale, so it gets a second index in the "C" collation.
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute('CREATE INDEX ix_assets_s3_key_c ON assets (s3_key COLLATE "C")')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX ix_assets_s3_key_c")
@@ -0,0 +1,32 @@
+"""asset FBX metadata columns
+
+Revision ID: 64d139d88aa8
+Revises: 9ed89b9b4a8b
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '64d139d88aa8'
+down_revision = '9ed89b9b4a8b'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['fbx_version', 'polygon_count', 'mesh_count', 'material_count', 'bone_count']
+
+
+def upgrade():
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        for col in COLUMNS:
+            batch_op.add_column(sa.Column(col, sa.Integer(), nullable=True))
+            batch_op.create_index(f'ix_assets_{col}', [col], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        for col in reversed(COLUMNS):
+            batch_op.drop_index(f'ix_assets_{col}')
+            batch_op.drop_column(col)
@@ -0,0 +1,45 @@
+"""asset_tags tag_id index and ON DELETE CASCADE, created_at and lower(name) indexes
+
+Revision ID: 25be9c448d4a
+Revises: 64d139d88aa8
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '25be9c448d4a'
+down_revision = '64d139d88aa8'
+branch_labels = None
+depends_on = None
+
+# The association table's foreign keys were created unnamed. Postgres named
+# them <table>_<column>_fkey; the same convention names SQLite's reflected
+# ones so batch mode can drop and recreate them.
+NAMING = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+FKS = [('asset_id', 'assets'), ('tag_id', 'tags')]
+
+
+def _replace_fks(ondelete):
+    with op.batch_alter_table('asset_tags', schema=None, naming_convention=NAMING) as batch_op:
+        for col, table in FKS:
+            name = f'asset_tags_{col}_fkey'
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, table, [col], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_fks('CASCADE')
+    # The primary key (asset_id, tag_id) only serves lookups by asset
+    op.create_index('ix_asset_tags_tag_id', 'asset_tags', ['tag_id', 'asset_id'], unique=False)
+    op.create_index('ix_assets_created_at', 'assets', ['created_at'], unique=False)
+    op.create_index('ix_assets_name_lower', 'assets', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_assets_name_lower', table_name='assets')
+    op.drop_index('ix_assets_created_at', table_name='assets')
+    op.drop_index('ix_asset_tags_tag_id', table_name='asset_tags')
+    _replace_fks(None)
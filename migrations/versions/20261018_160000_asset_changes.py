@@ -0,0 +1,34 @@
+"""asset_changes log for the incremental change feed
+
+Revision ID: 84aad72e771e
+Revises: 25be9c448d4a
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '84aad72e771e'
+down_revision = '25be9c448d4a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('asset_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_asset_changes_asset_id', 'asset_changes', ['asset_id', 'id'], unique=False)
+    # Existing assets are the first changes, so a client starting from
+    # cursor 0 gets the whole catalog
+    op.execute("INSERT INTO asset_changes (asset_id) SELECT id FROM assets ORDER BY id")
+
+
+def downgrade():
+    op.drop_index('ix_asset_changes_asset_id', table_name='asset_changes')
+    op.drop_table('asset_changes')
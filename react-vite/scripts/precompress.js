@@ -0,0 +1,43 @@
+// react-vite/scripts/precompress.js
+// Writes .br and .gz siblings for compressible files in dist/ so the Flask
+// static layer (app/static_files.py) can serve them without compressing
+// per request. Runs after `vite build` (see package.json).
+import { readdirSync, readFileSync, statSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import { brotliCompressSync, gzipSync, constants } from "node:zlib";
+
+const DIST = new URL("../dist/", import.meta.url).pathname;
+const COMPRESSIBLE = /\.(js|mjs|css|html|svg|json|txt|map|ico|xml|wasm)$/i;
+const MIN_SIZE = 1024;
+
+function* walk(dir) {
+  for (const name of readdirSync(dir)) {
+    const path = join(dir, name);
+    if (statSync(path).isDirectory()) yield* walk(path);
+    else yield path;
+  }
+}
+
+let written = 0;
+for (const path of walk(DIST)) {
+  if (!COMPRESSIBLE.test(path)) continue;
+  const data = readFileSync(path);
+  if (data.length < MIN_SIZE) continue;
+  const variants = {
+    ".br": brotliCompressSync(data, {
+      params: {
+        [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+        [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+      },
+    }),
+    ".gz": gzipSync(data, { level: 9 }),
+  };
+  for (const [suffix, out] of Object.entries(variants)) {
+    // Not worth a second request path if it barely shrinks
+    if (out.length < data.length * 0.9) {
+      writeFileSync(path + suffix, out);
+      written += 1;
+    }
+  }
+}
+console.log(`precompress: ${written} file(s) written`);
@@ -22,7 +22,18 @@ api.interceptors.request.use((config) => {
 export const listTags   = () => api.get("/tags").then(r => r.data);
 export const createTag  = (name) => api.post("/tags", { name }).then(r => r.data);
 
-export const listAssets   = (params={}) => api.get("/assets", { params }).then(r => r.data);
+// GET /assets is paged; follow next_cursor until the last page
+export async function listAssets(params = {}) {
+  const assets = [];
+  let after;
+  do {
+    const { data } = await api.get("/assets", { params: { ...params, after } });
+    assets.push(...(data.assets || data));
+    after = data.next_cursor;
+  } while (after != null);
+  return { assets };
+}
+
 export const createAsset  = (data) => api.post("/assets", data).then(r => r.data);
 export const deleteAsset  = (id)   => api.delete(`/assets/${id}`).then(r => r.data);
 
@@ -12,4 +12,5 @@ export FLASK_APP=app
 
 flask db upgrade || echo "⚠️ migrations failed (continuing to boot)"
 
-exec gunicorn --workers 2 --bind 0.0.0.0:${PORT:-10000} app:app
+# Worker class, processes and threads: see gunicorn.conf.py
+exec gunicorn --config gunicorn.conf.py app:app
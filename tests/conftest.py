@@ -0,0 +1,75 @@
+# tests/conftest.py
+# The app reads its config from the environment at import time, so point it
+# at a throwaway SQLite database (and cache/metrics files) before any test
+# module imports it.
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_WORKDIR = tempfile.mkdtemp(prefix="assetshub-tests-")
+
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(_WORKDIR, "test.db"),
+    "RESPONSE_CACHE_PATH": os.path.join(_WORKDIR, "response-cache.sqlite3"),
+    "METRICS_PATH": os.path.join(_WORKDIR, "metrics.sqlite3"),
+    "AWS_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "S3_BUCKET": "assetshub-test",
+})
+os.environ.pop("RENDER", None)
+os.environ.pop("FLASK_ENV", None)
+os.environ.pop("DATABASE_REPLICA_URL", None)
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import app, db
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    with app.app_context():
+        db.engine.echo = False
+        db.create_all()
+    yield app
+    shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def catalog(app):
+    """seed(n): replace the catalog with n assets, each carrying two of three tags."""
+    from app import db, response_cache, search
+    from app.models import Asset, Tag, asset_tags
+    from app.tag_index import tag_index
+
+    def seed(n):
+        with app.app_context():
+            db.session.execute(asset_tags.delete())
+            db.session.execute(db.delete(Asset))
+            db.session.execute(db.delete(Tag))
+            db.session.execute(db.insert(Tag), [{"id": i, "name": f"tag-{i}"} for i in (1, 2, 3)])
+            db.session.execute(db.insert(Asset), [
+                {"id": i, "name": f"asset-{i}", "s3_key": f"assets/{i}.fbx"}
+                for i in range(1, n + 1)
+            ])
+            db.session.execute(asset_tags.insert(), [
+                {"asset_id": i, "tag_id": t}
+                for i in range(1, n + 1) for t in (1 + i % 3, 1 + (i + 1) % 3)
+            ])
+            search.rebuild()
+            db.session.commit()
+            response_cache.bump()
+            tag_index.invalidate()
+
+    return seed
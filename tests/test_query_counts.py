@@ -0,0 +1,43 @@
+# tests/test_query_counts.py
+# The list endpoints must run a fixed number of SQL statements however many
+# rows they return (no N+1 loads of Asset.tags / Tag.assets).
+
+import pytest
+from sqlalchemy import event
+
+LIST_ENDPOINTS = [
+    "/api/assets",
+    "/api/assets?format=ndjson",
+    "/api/tags",
+]
+
+
+def _count_statements(app, client, url):
+    from app import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = client.get(url)
+        resp.get_data()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert resp.status_code == 200, resp.get_data()[:200]
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", LIST_ENDPOINTS)
+def test_list_statement_count_does_not_grow_with_rows(app, client, catalog, path):
+    counts = {}
+    for n in (3, 30):
+        catalog(n)
+        # A distinct query string so the shared response cache never answers
+        sep = "&" if "?" in path else "?"
+        counts[n] = _count_statements(app, client, f"{path}{sep}rows={n}")
+    assert counts[3] == counts[30], counts
@@ -0,0 +1,145 @@
+# tests/test_query_plans.py
+# Query-plan regression check for the hot API paths (SQLite).
+#
+# Each case runs through the test client while the SQL it executes is
+# recorded; every recorded statement then goes through EXPLAIN QUERY PLAN.
+# A step that scans all of assets, asset_tags, tags or asset_changes
+# ("SCAN <table>" without an index that bounds it) or sorts them in a temp
+# B-tree fails, unless the case allows that table (e.g. the first listing
+# page walks the primary key backwards and stops at LIMIT). SQLite plans
+# from its schema alone here (no ANALYZE statistics), so a small catalog
+# gets the same plans as a large one.
+
+import re
+
+import pytest
+from sqlalchemy import event
+
+HOT_TABLES = {"assets", "asset_tags", "tags", "asset_changes"}
+# Aliases in the hand-written search SQL (app/search.py); SQLAlchemy's own
+# are <table>_<n>
+_ALIASES = {"a": "assets", "at": "asset_tags", "t": "tags"}
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+
+
+# ---------- cases -------------------------------------------------------------
+# name -> (fn(client, state), tables allowed to be scanned in key order)
+
+def _state(app):
+    from app import db
+    from app.models import Asset, Tag, asset_tags
+
+    with app.app_context():
+        ids = db.session.execute(db.select(Asset.id).order_by(Asset.id)).scalars().all()
+        tags = db.session.execute(
+            db.select(Tag.id, Tag.name)
+            .join(asset_tags, asset_tags.c.tag_id == Tag.id)
+            .group_by(Tag.id, Tag.name)
+            .order_by(db.func.count().desc())
+            .limit(3)
+        ).all()
+    return {"ids": ids, "tags": tags, "sha": "0" * 64}
+
+
+def _direct(stmt_fn):
+    """A case that runs one statement instead of a request."""
+    def call(client, state):
+        from app import db
+
+        with client.application.app_context():
+            db.session.execute(stmt_fn()).all()
+    return call
+
+
+def _by_name():
+    from app import db
+    from app.models import Asset
+
+    return db.select(Asset.id).where(db.func.lower(Asset.name) == "asset-42")
+
+
+def _newest():
+    from app import db
+    from app.models import Asset
+
+    return db.select(Asset.id).order_by(Asset.created_at.desc()).limit(100)
+
+
+CASES = {
+    "list_assets_first_page": (
+        lambda c, s: c.get("/api/assets?limit=10"), {"assets"}),
+    "list_assets_after": (
+        lambda c, s: c.get("/api/assets?limit=10&after=%d" % s["ids"][len(s["ids"]) // 2]),
+        set()),
+    "list_assets_tags_sql": (
+        lambda c, s: c.get("/api/assets?limit=10&polygons_min=0&mode=any&tags="
+                           + ",".join(name for _, name in s["tags"][:2])),
+        set()),
+    "find_by_content_hash": (
+        lambda c, s: c.get("/api/uploads/s3-url?filename=plan.fbx&sha256=" + s["sha"]), set()),
+    "rename_tag": (
+        lambda c, s: c.put("/api/tags/%d" % s["tags"][0][0], json={"name": "plan-renamed"}),
+        set()),
+    "delete_tag": (
+        lambda c, s: c.delete("/api/tags/%d" % s["tags"][1][0]), set()),
+    "delete_asset": (
+        lambda c, s: c.delete("/api/assets/%d" % s["ids"][len(s["ids"]) // 3]), set()),
+    "asset_changes_delta": (
+        lambda c, s: c.get("/api/assets/changes?since=%d" % (len(s["ids"]) - 10)), set()),
+    "assets_by_name_ci": (_direct(_by_name), set()),
+    "assets_newest_first": (_direct(_newest), {"assets"}),
+}
+
+
+# ---------- plans -------------------------------------------------------------
+
+def _problems(plan, allowed):
+    out = []
+    for detail in plan:
+        if "TEMP B-TREE FOR ORDER BY" in detail or "TEMP B-TREE FOR GROUP BY" in detail:
+            out.append(detail)
+            continue
+        m = _SCAN.match(detail)
+        if not m:
+            continue
+        table = _ALIASES.get(m.group(1), re.sub(r"_\d+$", "", m.group(1)))
+        if table not in HOT_TABLES or table in allowed:
+            continue
+        # "SCAN t USING COVERING INDEX ..." still reads every entry
+        out.append(detail if "INDEX" not in m.group(2) else detail + " (full index scan)")
+    return out
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_hot_query_uses_an_index(app, client, catalog, name):
+    from app import db
+
+    catalog(30)
+    state = _state(app)
+    call, allowed = CASES[name]
+    with app.app_context():
+        engine = db.engine
+
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+            params = parameters[0] if executemany and parameters else parameters
+            recorded.append((statement, tuple(params or ())))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = call(client, state)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert getattr(resp, "status_code", 200) < 400, resp.get_data()[:200]
+    assert recorded
+
+    bad = []
+    with engine.connect() as conn:
+        for statement, params in recorded:
+            plan = [r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params)]
+            problems = _problems(plan, allowed)
+            if problems:
+                bad.append(f"{' '.join(statement.split())[:160]}\n    " + "\n    ".join(plan))
+    assert not bad, "\n\n".join(bad)
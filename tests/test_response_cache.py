@@ -0,0 +1,45 @@
+# tests/test_response_cache.py
+# Responses built from per-worker state must not be shared through the
+# response cache: a worker whose tag index predates another worker's write
+# would otherwise pin its stale page under the new cache version.
+
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# Another gunicorn worker: builds its tag index, waits while this process
+# writes, then answers the same tag-filtered page from the stale index
+_OTHER_WORKER = """
+import sys
+from app import app
+client = app.test_client()
+client.get(sys.argv[1])
+print("ready", flush=True)
+sys.stdin.readline()
+client.get(sys.argv[1])
+"""
+
+
+def test_tag_page_is_not_cached_from_another_workers_index(app, client, catalog):
+    catalog(3)
+    url = "/api/assets?tags=tag-1"
+    other = subprocess.Popen(
+        [sys.executable, "-c", _OTHER_WORKER, url],
+        cwd=ROOT,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        for line in other.stdout:
+            if line.strip() == "ready":
+                break
+        resp = client.post("/api/assets", json={"name": "fresh", "tags": ["tag-1"]})
+        assert resp.status_code == 201
+        other.communicate("go\n", timeout=60)
+    finally:
+        if other.poll() is None:
+            other.kill()
+    assert other.returncode == 0
+
+    names = [a["name"] for a in client.get(url).get_json()["assets"]]
+    assert "fresh" in names
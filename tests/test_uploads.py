@@ -0,0 +1,64 @@
+# tests/test_uploads.py
+# Upload and content-hash endpoints against a mocked S3 bucket.
+
+import hashlib
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+
+@pytest.fixture
+def bucket():
+    with mock_aws():
+        boto3.client("s3", region_name=os.environ["AWS_REGION"]).create_bucket(
+            Bucket=os.environ["S3_BUCKET"]
+        )
+        yield os.environ["S3_BUCKET"]
+
+
+def test_abort_twice_is_not_found(client, bucket):
+    resp = client.post("/api/uploads/multipart", json={"filename": "model.fbx"})
+    assert resp.status_code == 201
+    ref = {"key": resp.get_json()["key"], "upload_id": resp.get_json()["upload_id"]}
+
+    assert client.post("/api/uploads/multipart/abort", json=ref).status_code == 200
+    resp = client.post("/api/uploads/multipart/abort", json=ref)
+    assert resp.status_code == 404
+    assert resp.get_json() == {"error": "no such upload"}
+
+
+def test_duplicate_content_drops_the_claimed_hash(app, client, bucket):
+    from app import db
+    from app.models import Asset
+
+    body = b"same bytes"
+    digest = hashlib.sha256(body).hexdigest()
+    claimed = "b" * 64
+    s3 = boto3.client("s3", region_name=os.environ["AWS_REGION"])
+    s3.put_object(Bucket=bucket, Key="assets/original.fbx", Body=body)
+    s3.put_object(Bucket=bucket, Key="assets/copy.fbx", Body=body)
+    with app.app_context():
+        db.session.execute(db.delete(Asset).where(Asset.content_sha256.in_([digest, claimed])))
+        original = Asset(name="original", s3_key="assets/original.fbx", content_sha256=digest)
+        copy = Asset(name="copy", s3_key="assets/copy.fbx", content_sha256=claimed)
+        db.session.add_all([original, copy])
+        db.session.commit()
+        original_id, copy_id = original.id, copy.id
+
+    resp = client.post(f"/api/assets/{copy_id}/verify-hash")
+    assert resp.status_code == 409
+    assert resp.get_json()["duplicate_of"] == original_id
+    with app.app_context():
+        assert db.session.get(Asset, copy_id).content_sha256 is None
+
+    # Upload dedup must not match the copy through the wrong claim
+    resp = client.get("/api/uploads/s3-url", query_string={"filename": "x.fbx", "sha256": claimed})
+    assert resp.get_json()["exists"] is False
+
+
+@pytest.mark.parametrize("bad", [True, 1.9, "7", None])
+def test_get_urls_rejects_non_integer_asset_ids(client, bad):
+    resp = client.post("/api/uploads/get-urls", json={"asset_ids": [bad]})
+    assert resp.status_code == 400